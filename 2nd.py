@@ -1,54 +1,192 @@
+import argparse
 import curses
 import random
 import time
+from collections import deque
 
-def main(stdscr):
-    curses.curs_set(0)
-    stdscr.nodelay(True)
-    stdscr.timeout(100)
-    stdscr.keypad(True)  # Enable keypad mode for arrow keys
+from game_loop import GameLoop, RandomKeys
+from instrumentation import profiler, timed
 
-    sh, sw = stdscr.getmaxyx()
-    player_x = sw // 2
-    score = 0
-    star = [0, random.randint(1, sw-2)]
+MIN_WIDTH = 20   # room for the score and "Game Over!"
+MIN_HEIGHT = 5
 
-    while True:
-        stdscr.clear()
-        stdscr.border()
+class StarField:
+    """The star-catcher rules with no terminal attached.
 
-        # Draw player
-        stdscr.addstr(sh-2, player_x, "A")
+    The field is ``width`` x ``height`` cells, border included; the player
+    walks along row ``height - 2`` and every star falls one row per tick.
+    ``rows[y]`` holds the stars in row y as {column: count}, so the whole
+    field falls by rotating the deque, and a catch is one dict lookup in the
+    player's row however many stars there are. Caught and missed stars are
+    replaced at the top, keeping ``stars`` in play; each miss costs a life.
+    """
 
-        # Draw star
-        stdscr.addstr(star[0], star[1], "*")
+    def __init__(self, width, height, stars=1, lives=1, seed=None):
+        self.rng = random.Random(seed)
+        self.width = width
+        self.height = height
+        self.player_x = width // 2
+        self.score = 0
+        self.lives = lives
+        self.ticks = 0
+        self.running = True
+        self.game_over = False
+        self.rows = deque({} for _ in range(height - 1))
+        # Spread out so they do not all land on the same tick
+        for i in range(stars):
+            self.drop(self.rows[i * (height - 2) // stars])
 
-        # Display score
-        stdscr.addstr(0, 2, f" Score: {score} ")
+    def drop(self, row, count=1):
+        for _ in range(count):
+            x = self.rng.randint(1, self.width - 2)
+            row[x] = row.get(x, 0) + 1
 
-        key = stdscr.getch()
-        if key == curses.KEY_LEFT and player_x > 1:
-            player_x -= 1
-        elif key == curses.KEY_RIGHT and player_x < sw-2:
-            player_x += 1
+    def star_cells(self):
+        for y, row in enumerate(self.rows):
+            for x in row:
+                yield x, y
+
+    def step(self, key):
+        self.ticks += 1
+        if key == curses.KEY_LEFT and self.player_x > 1:
+            self.player_x -= 1
+        elif key == curses.KEY_RIGHT and self.player_x < self.width - 2:
+            self.player_x += 1
         elif key == ord('q'):
-            break
+            self.running = False
+            return
 
-        # Move star down
-        star[0] += 1
+        # Move stars down: the player's row falls out the bottom as misses
+        rows = self.rows
+        missed = rows.pop()
+        rows.appendleft({})
 
         # Check for catch
-        if star[0] == sh-2 and star[1] == player_x:
-            score += 1
-            star = [0, random.randint(1, sw-2)]
-        elif star[0] > sh-2:
-            stdscr.addstr(sh//2, sw//2-5, "Game Over!")
-            stdscr.refresh()
-            time.sleep(2)
-            break
-
-        stdscr.refresh()
-        time.sleep(0.05)
+        caught = rows[-1].pop(self.player_x, 0)
+        lost = sum(missed.values())
+        self.score += caught
+        self.lives -= lost
+        if lost and self.lives <= 0:
+            self.game_over = True
+            self.running = False
+            return
+        self.drop(rows[0], caught + lost)
+
+class RandomInput(RandomKeys):
+    KEYS = [-1, -1, curses.KEY_LEFT, curses.KEY_RIGHT]
+
+class Renderer:
+    """Draws a StarField, rewriting only the cells that changed since the previous frame.
+
+    Stars, the player and the text lines are all tracked as cells; a cell
+    left empty is restored to blank or border. If the terminal is smaller
+    than the field, a notice is shown instead until it is enlarged again.
+    """
+
+    def __init__(self, stdscr, field):
+        self.stdscr = stdscr
+        self.field = field
+        self.invalidate()
+
+    def invalidate(self):
+        # Forget what is on screen; called at start and on KEY_RESIZE.
+        self.screen_height, self.screen_width = self.stdscr.getmaxyx()
+        self.fits = self.screen_height >= self.field.height and self.screen_width >= self.field.width
+        self.drawn = {}
+        self.stdscr.erase()
+        if self.fits:
+            self.stdscr.border()
+
+    def background(self, x, y):
+        field = self.field
+        if y == 0 or y == field.height - 1:
+            return curses.ACS_HLINE
+        if x == 0 or x == field.width - 1:
+            return curses.ACS_VLINE
+        return ' '
+
+    def render(self, overlay=None, message=None):
+        field = self.field
+        if not self.fits:
+            notice = f"Terminal too small: need {field.width}x{field.height}"
+            self.stdscr.addnstr(0, 0, notice, max(0, self.screen_width - 1))
+            self.stdscr.refresh()
+            return
+
+        # Stars hide the player and text hides both
+        cells = {(field.player_x, field.height - 2): 'A'}
+        cells.update(dict.fromkeys(field.star_cells(), '*'))
+        text = [(0, 2, f" Score: {field.score} ")]
+        if overlay:
+            text.append((1, 1, overlay))
+        if message:
+            text.append((field.height // 2, field.width // 2 - len(message) // 2, message))
+        for y, x, line in text:
+            for i, char in enumerate(line[:field.width - 1 - x]):
+                cells[x + i, y] = char
+
+        addch = self.stdscr.addch
+        drawn = self.drawn
+        for x, y in drawn.keys() - cells.keys():
+            addch(y, x, self.background(x, y))
+        for (x, y), char in cells.items():
+            if drawn.get((x, y)) != char:
+                addch(y, x, char)
+        self.drawn = cells
+        self.stdscr.refresh()
+
+def main(stdscr, tick_seconds=0.1, stats_file=None, stars=1, lives=1, seed=None):
+    curses.curs_set(0)
+    stdscr.nodelay(True)
+    stdscr.keypad(True)  # Enable keypad mode for arrow keys
+
+    sh, sw = stdscr.getmaxyx()
+    field = StarField(max(sw, MIN_WIDTH), max(sh, MIN_HEIGHT), stars, lives, seed)
+    renderer = Renderer(stdscr, field)
+    show_stats = False
+
+    @timed("tick")
+    def tick():
+        nonlocal show_stats
+        key = stdscr.getch()
+        if key == curses.KEY_RESIZE:
+            renderer.invalidate()
+        elif key == ord('f'):
+            show_stats = not show_stats
+        # The game waits while the player cannot see it
+        if renderer.fits:
+            field.step(key)
+        elif key == ord('q'):
+            field.running = False
+        return field.running
+
+    @timed("render")
+    def render():
+        renderer.render(loop.stats.overlay() if show_stats else None)
+
+    loop = GameLoop(tick, render, tick_seconds)
+    try:
+        loop.run()
+    finally:
+        if stats_file:
+            loop.stats.dump(stats_file)
+
+    if field.game_over:
+        renderer.render(message="Game Over!")
+        time.sleep(2)
 
 if __name__ == "__main__":
-    curses.wrapper(main)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Catch the falling stars ('f' toggles frame stats)")
+    parser.add_argument("--tick-ms", type=float, default=100, help="tick length in milliseconds")
+    parser.add_argument("--frame-stats", metavar="PATH", help="write tick/render timings to PATH as JSON on exit")
+    parser.add_argument("--stars", type=int, default=1, help="stars falling at once")
+    parser.add_argument("--lives", type=int, default=1, help="stars you may miss")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--profile", metavar="PATH",
+                        help="time ticks and renders and write a summary to PATH on exit (.pstats: a cProfile dump)")
+    args = parser.parse_args()
+    if args.stars < 1 or args.lives < 1:
+        parser.error("--stars and --lives must be at least 1")
+    if args.profile:
+        profiler.enable(args.profile)
+    curses.wrapper(main, args.tick_ms / 1000, args.frame_stats, args.stars, args.lives, args.seed)
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the Python tools in this repo.
+
+Run ``python benchmarks.py <name>``; ``python benchmarks.py --help`` lists them.
+"""
+import argparse
+import csv
+import gc
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+
+def make_entries(count):
+    return [
+        {
+            "name": f"User {i}",
+            "age": 18 + i % 80,
+            "email": f"user{i}@example.com",
+            "address": f"{i} Main Street, Springfield",
+            "timestamp": "2025-01-01 12:00:00",
+        }
+        for i in range(count)
+    ]
+
+
+def empty_system(workdir, name="bench_data.json", **kwargs):
+    from data_entry_system import DataEntrySystem
+    return DataEntrySystem(os.path.join(workdir, name), **kwargs)
+
+
+def bench_email_index(args):
+    lookups = args.lookups
+    print(f"{'entries':>10} {'build (s)':>10} {'hit (us)':>10} {'miss (us)':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            system = empty_system(workdir)
+            system.entries = make_entries(size)
+            start = time.perf_counter()
+            system.build_indexes()
+            build = time.perf_counter() - start
+
+            hit = f"USER{size // 2}@Example.com"
+            miss = "nobody@example.com"
+            hit_time = timeit.timeit(lambda: system.email_exists(hit), number=lookups)
+            miss_time = timeit.timeit(lambda: system.email_exists(miss), number=lookups)
+            print(f"{size:>10} {build:>10.3f} {hit_time / lookups * 1e6:>10.3f} {miss_time / lookups * 1e6:>10.3f}")
+
+
+def bench_search(args):
+    queries = ["user 4242", "99@exa", "4242 main", "zzz"]
+    print(f"{'entries':>10} {'build (s)':>10} {'linear (ms)':>12} {'index (ms)':>11} {'top-20 (ms)':>12}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            system = empty_system(workdir)
+            system.entries = make_entries(size)
+            start = time.perf_counter()
+            system.build_search_index()
+            build = time.perf_counter() - start
+
+            def linear():
+                for term in queries:
+                    [entry for entry in system.entries
+                     if term in entry["name"].lower() or term in entry["email"].lower()
+                     or term in entry["address"].lower()]
+
+            def indexed():
+                for term in queries:
+                    system.find_entries(term)
+
+            def top20():
+                for term in queries:
+                    system.find_entries(term, limit=20, ranked=True)
+
+            per_query = [timeit.timeit(fn, number=args.repeat) / args.repeat / len(queries) * 1e3
+                         for fn in (linear, indexed, top20)]
+            print(f"{size:>10} {build:>10.2f} {per_query[0]:>12.2f} {per_query[1]:>11.2f} {per_query[2]:>12.2f}")
+
+
+def bench_import(args):
+    from data_entry_system import iter_import_rows
+    print(f"{'rows':>10} {'workers':>8} {'imported':>10} {'rejected':>9} {'rows/s':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, "import.csv")
+        with open(source, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=["name", "age", "email", "address"])
+            writer.writeheader()
+            for i in range(args.rows):
+                # Every 50th row repeats an earlier email, every 97th is invalid.
+                writer.writerow({
+                    "name": f"User {i}",
+                    "age": 200 if i % 97 == 0 else 18 + i % 80,
+                    "email": f"user{i - 1 if i % 50 == 0 else i}@example.com",
+                    "address": f"{i} Main Street",
+                })
+
+        for workers in args.workers:
+            system = empty_system(workdir, f"import_{workers}.json")
+            start = time.perf_counter()
+            imported, rejected = system.import_entries(iter_import_rows(source, "csv"), args.batch_size, workers)
+            elapsed = time.perf_counter() - start
+            system.close()
+            print(f"{args.rows:>10} {workers:>8} {imported:>10} {rejected:>9} {args.rows / elapsed:>10,.0f}")
+
+
+def bench_memory(args):
+    from data_entry_system import EntryColumns
+    print(f"{'entries':>10} {'dicts (B/row)':>14} {'columns (B/row)':>16} {'ratio':>6}")
+    for size in args.sizes:
+        # Records are parsed one line at a time, the way the journal is read,
+        # so only the resident representation is measured.
+        lines = [json.dumps(entry) for entry in make_entries(size)]
+
+        tracemalloc.start()
+        entries = [json.loads(line) for line in lines]
+        as_dicts = tracemalloc.get_traced_memory()[0]
+        del entries
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        columns = EntryColumns(json.loads(line) for line in lines)
+        as_columns = tracemalloc.get_traced_memory()[0]
+        del columns
+        tracemalloc.stop()
+
+        print(f"{size:>10} {as_dicts / size:>14.0f} {as_columns / size:>16.0f} {as_dicts / as_columns:>6.1f}")
+
+
+def bench_open(args):
+    from data_entry_system import DataEntrySystem, JournalStorage, SQLiteStorage
+    print(f"{'entries':>10} {'backend':>8} {'open (s)':>9} {'peak MiB':>9} {'lookup (us)':>12}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            data_file = os.path.join(workdir, f"open_{size}.json")
+            entries = make_entries(size)
+            JournalStorage(data_file).save(entries)
+            database = SQLiteStorage(data_file)
+            database.load()  # imports the JSON store on first open
+            database.close()
+            SQLiteStorage(data_file).load()  # and checkpoints its WAL on the next
+            del entries
+
+            for name, backend in (("journal", JournalStorage), ("sqlite", SQLiteStorage)):
+                tracemalloc.start()
+                start = time.perf_counter()
+                system = DataEntrySystem(data_file, backend(data_file))
+                system.entries  # loading is deferred to first use
+                opened = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                email = f"user{size // 2}@example.com"
+                lookup = timeit.timeit(lambda: system.email_exists(email), number=1000) / 1000
+                system.close()
+                del system
+                gc.collect()
+                print(f"{size:>10} {name:>8} {opened:>9.3f} {peak / 2**20:>9.1f} {lookup * 1e6:>12.2f}")
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TIME_TO_MENU = """
+import sys
+import data_entry_system
+system = data_entry_system.DataEntrySystem(sys.argv[1])
+system.display_welcome()
+from simple_term_menu import TerminalMenu
+"""
+
+
+def median_runtime(command, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench_startup(args):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import data_entry_system"],
+                            cwd=REPO_DIR, check=True, capture_output=True, text=True)
+    module_line = next(line for line in result.stderr.splitlines() if line.endswith("| data_entry_system"))
+    import_ms = int(module_line.split("|")[1]) / 1000
+
+    with tempfile.TemporaryDirectory() as workdir:
+        data_file = os.path.join(workdir, "startup.json")
+        from data_entry_system import JournalStorage
+        JournalStorage(data_file).save(make_entries(args.entries))
+
+        interpreter = median_runtime([sys.executable, "-c", "pass"], args.runs)
+        to_menu = median_runtime([sys.executable, "-c", TIME_TO_MENU, data_file], args.runs) - interpreter
+
+    print(f"import data_entry_system: {import_ms:.1f} ms (-X importtime, cumulative)")
+    print(f"time to menu over a {args.entries}-entry store: {to_menu * 1e3:.1f} ms "
+          f"(median of {args.runs}, interpreter start-up excluded; target {args.target_ms} ms)")
+    if to_menu * 1e3 > args.target_ms:
+        sys.exit("time to menu is over target")
+
+
+def bench_dungeon(args):
+    from dungeon_stay import RandomInput, Simulation, run_headless
+    print(f"{'seed':>6} {'ticks':>8} {'wave':>5} {'enemies':>8} {'ticks/s':>10}")
+    for seed in range(args.seeds):
+        sim = Simulation(seed)
+        # An unkillable player keeps the run going so later, larger waves are measured too.
+        sim.player.health = float("inf")
+        start = time.perf_counter()
+        run_headless(sim, RandomInput(seed), args.ticks)
+        elapsed = time.perf_counter() - start
+        print(f"{seed:>6} {sim.ticks:>8} {sim.wave:>5} {len(sim.enemies):>8} {sim.ticks / elapsed:>10,.0f}")
+
+
+def bench_dungeon_batch(args):
+    from dungeon_stay import BatchSimulation, Simulation
+    print(f"{'enemies':>8} {'objects (ticks/s)':>18} {'numpy (ticks/s)':>16} {'speed-up':>9}")
+    for size in args.sizes:
+        rates = []
+        for simulation in (Simulation, BatchSimulation):
+            # A map large enough that the horde is still closing in while it is timed.
+            sim = simulation(0, map_width=400, map_height=200)
+            sim.player.health = float("inf")
+            sim.spawn_enemies(size)
+            start = time.perf_counter()
+            for _ in range(args.ticks):
+                sim.step(-1)
+            rates.append(args.ticks / (time.perf_counter() - start))
+        print(f"{size:>8} {rates[0]:>18,.1f} {rates[1]:>16,.1f} {rates[1] / rates[0]:>8.1f}x")
+
+
+def bench_dungeon_flow(args):
+    import curses
+    from dungeon_stay import BatchSimulation, FlowField, Simulation, barrier_walls
+    width, height = args.map_size
+    walls = barrier_walls(width, height)
+    field = FlowField(width, height, walls)
+    # Rebuilding the field for a moving target is the whole pathfinding cost
+    search = timeit.timeit(lambda: (field.invalidate(), field.update(width // 2, height // 2)),
+                           number=20) / 20
+
+    print(f"{width}x{height} map with walls; the player moves every tick, so the field is rebuilt every tick")
+    print(f"{'enemies':>8} {'field (ms)':>11} {'objects (ms/tick)':>18} {'numpy (ms/tick)':>16} "
+          f"{'search per enemy (ms/tick)':>27}")
+    for size in args.sizes:
+        per_tick = []
+        for simulation in (Simulation, BatchSimulation):
+            sim = simulation(0, width, height, walls)
+            sim.player.health = float("inf")
+            sim.spawn_enemies(size)
+            keys = [curses.KEY_LEFT, curses.KEY_RIGHT]
+            start = time.perf_counter()
+            for tick in range(args.ticks):
+                sim.step(keys[tick % 2])
+            per_tick.append((time.perf_counter() - start) / args.ticks * 1e3)
+        print(f"{size:>8} {search * 1e3:>11.2f} {per_tick[0]:>18.2f} {per_tick[1]:>16.2f} "
+              f"{search * size * 1e3:>27,.0f}")
+
+
+def bench_dungeon_alloc(args):
+    from dungeon_stay import Simulation
+    print(f"{'enemies':>8} {'B/enemy':>8} {'spawn (ms)':>11} {'ticks/s':>8}")
+    for size in args.sizes:
+        sim = Simulation(0, 400, 200)
+        gc.collect()
+        tracemalloc.start()
+        sim.spawn_enemies(size)
+        per_enemy = tracemalloc.get_traced_memory()[0] / size
+        tracemalloc.stop()
+        del sim
+        gc.collect()
+
+        sim = Simulation(0, 400, 200)
+        sim.player.health = float("inf")
+        start = time.perf_counter()
+        sim.spawn_enemies(size)
+        spawn = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            sim.step(ord('a'))
+        rate = args.ticks / (time.perf_counter() - start)
+        print(f"{size:>8} {per_enemy:>8.0f} {spawn * 1e3:>11.1f} {rate:>8.1f}")
+
+
+def bench_calculator(args):
+    import random
+    from my import Calculator, stream, stream_columns
+    rng = random.Random(0)
+    ops = list(Calculator.OPERATIONS)
+    modes = [("stream", stream),
+             ("numpy", lambda calc, lines, out: stream_columns(calc, lines, out, args.chunk_size))]
+    print(f"{'lines':>10} {'mode':>7} {'lines/s':>12} {'peak (KiB)':>11}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            path = os.path.join(workdir, f"ops_{size}.csv")
+            with open(path, "w") as file:
+                for _ in range(size):
+                    file.write(f"{rng.choice(ops)},{rng.uniform(-1e6, 1e6)},{rng.randint(-9, 9)}\n")
+            for mode, run in modes:
+                with open(path) as source, open(os.devnull, "w") as out:
+                    start = time.perf_counter()
+                    run(Calculator(), source, out)
+                    elapsed = time.perf_counter() - start
+                # A second, traced pass: tracemalloc would skew the timing
+                with open(path) as source, open(os.devnull, "w") as out:
+                    tracemalloc.start()
+                    run(Calculator(), source, out)
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                print(f"{size:>10} {mode:>7} {size / elapsed:>12,.0f} {peak / 1024:>11,.0f}")
+
+
+def bench_formula(args):
+    import random
+    from my import Calculator, stream_formula
+    calc = Calculator()
+    formula = args.formula
+    cold = timeit.timeit(lambda: calc.compile.__wrapped__(formula), number=1000) / 1000
+    calc.compile(formula)
+    cached = timeit.timeit(lambda: calc.compile(formula), number=100_000) / 100_000
+    print(f"compile {cold * 1e6:.1f} us, cached lookup {cached * 1e6:.3f} us")
+
+    expression = calc.compile(formula)
+    rng = random.Random(0)
+    columns = [[rng.uniform(1, 100) for _ in range(args.rows)] for _ in expression.variables]
+    start = time.perf_counter()
+    for _ in map(expression.function, *columns):
+        pass
+    compiled = args.rows / (time.perf_counter() - start)
+    # What re-evaluating the text per row would cost, on a slice of the rows
+    rows = [dict(zip(expression.variables, values)) for values in zip(*columns)][:args.rows // 10]
+    scope = {"__builtins__": {}, "sqrt": math.sqrt}
+    start = time.perf_counter()
+    for row in rows:
+        eval(formula, scope, row)
+    uncompiled = len(rows) / (time.perf_counter() - start)
+
+    lines = [",".join(expression.variables) + "\n"]
+    lines += [",".join(map(str, values)) + "\n" for values in zip(*columns)]
+    with open(os.devnull, "w") as out:
+        start = time.perf_counter()
+        stream_formula(calc, formula, lines, out)
+        streamed = args.rows / (time.perf_counter() - start)
+    print(f"rows/s: compiled {compiled:,.0f}, eval() per row {uncompiled:,.0f}, "
+          f"my.py --formula (parse, evaluate, format) {streamed:,.0f}")
+
+
+class NullScreen:
+    """Enough of a curses window for 2nd.py's Renderer, counting cell writes instead of drawing."""
+
+    def __init__(self, height, width):
+        self.size = (height, width)
+        self.writes = 0
+
+    def getmaxyx(self):
+        return self.size
+
+    def addch(self, y, x, char):
+        self.writes += 1
+
+    def erase(self):
+        pass
+
+    border = refresh = erase
+
+
+def bench_stars(args):
+    import curses
+    import importlib
+    from game_loop import run_headless
+    stars = importlib.import_module("2nd")
+    curses.ACS_HLINE = curses.ACS_VLINE = '#'  # only set by initscr()
+    print(f"{'terminal':>9} {'stars':>7} {'ticks/s':>10} {'frame (ms)':>11} {'cells/frame':>12}")
+    for width, height in args.terminals:
+        for count in args.stars:
+            field = stars.StarField(width, height, count, lives=float("inf"), seed=0)
+            start = time.perf_counter()
+            run_headless(field, stars.RandomInput(0), args.ticks)
+            rate = args.ticks / (time.perf_counter() - start)
+
+            screen = NullScreen(height, width)
+            renderer = stars.Renderer(screen, field)
+            renderer.render()
+            screen.writes = 0
+            key = stars.RandomInput(1)
+            elapsed = 0.0
+            for _ in range(args.frames):
+                field.step(key(field))
+                start = time.perf_counter()
+                renderer.render()
+                elapsed += time.perf_counter() - start
+            print(f"{width:>4}x{height:<4} {count:>7} {rate:>10,.0f} {elapsed / args.frames * 1e3:>11.3f} "
+                  f"{screen.writes / args.frames:>12,.0f}")
+
+
+def bench_profile_overhead(args):
+    import dungeon_stay
+    from instrumentation import Profiler, profiler
+
+    def nothing():
+        pass
+
+    off, on = Profiler(), Profiler()
+    on.enabled = True  # recording without enable(), so nothing is written at exit
+    calls = 1_000_000
+    bare = timeit.timeit(nothing, number=calls) / calls
+    print(f"per call: bare {bare * 1e9:.0f} ns, "
+          f"profiling off +{(timeit.timeit(off.timed('x')(nothing), number=calls) / calls - bare) * 1e9:.0f} ns, "
+          f"on +{(timeit.timeit(on.timed('x')(nothing), number=calls) / calls - bare) * 1e9:.0f} ns")
+
+    timed_methods = [(cls, name, method) for cls in (dungeon_stay.Simulation, dungeon_stay.BatchSimulation)
+                     for name, method in vars(cls).items() if hasattr(method, "__wrapped__")]
+
+    def ticks_per_second():
+        # A steady horde, so every run does the same work per tick
+        sim = dungeon_stay.Simulation(0, map_width=120, map_height=60)
+        sim.player.health = float("inf")
+        sim.spawn_enemies(args.enemies)
+        start = time.perf_counter()
+        dungeon_stay.run_headless(sim, dungeon_stay.RandomInput(0), args.ticks)
+        return sim.ticks / (time.perf_counter() - start)
+
+    # Modes take turns and keep their best run, so drift on the machine hits all three alike
+    best = {"undecorated": 0.0, "off": 0.0, "on": 0.0}
+    for _ in range(args.repeat):
+        for cls, name, method in timed_methods:
+            setattr(cls, name, method.__wrapped__)
+        best["undecorated"] = max(best["undecorated"], ticks_per_second())
+        for cls, name, method in timed_methods:
+            setattr(cls, name, method)
+        best["off"] = max(best["off"], ticks_per_second())
+        profiler.enabled = True
+        try:
+            best["on"] = max(best["on"], ticks_per_second())
+        finally:
+            profiler.enabled = False
+    undecorated = best["undecorated"]
+    print(f"dungeon_stay ticks/s: undecorated {undecorated:,.0f}, "
+          f"profiling off {best['off']:,.0f} ({best['off'] / undecorated - 1:+.1%}), "
+          f"on {best['on']:,.0f} ({best['on'] / undecorated - 1:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    email = subparsers.add_parser("email-index", help="DataEntrySystem.email_exists lookup cost vs store size")
+    email.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    email.add_argument("--lookups", type=int, default=100_000)
+    email.set_defaults(func=bench_email_index)
+
+    search = subparsers.add_parser("search", help="DataEntrySystem.find_entries trigram index vs linear scan")
+    search.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    search.add_argument("--repeat", type=int, default=3)
+    search.set_defaults(func=bench_search)
+
+    bulk = subparsers.add_parser("import", help="DataEntrySystem.import_entries throughput")
+    bulk.add_argument("--rows", type=int, default=1_000_000)
+    bulk.add_argument("--batch-size", type=int, default=10_000)
+    bulk.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    bulk.set_defaults(func=bench_import)
+
+    memory = subparsers.add_parser("memory", help="list-of-dicts vs EntryColumns resident memory")
+    memory.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    memory.set_defaults(func=bench_memory)
+
+    opening = subparsers.add_parser("open", help="DataEntrySystem startup time and memory per backend")
+    opening.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    opening.set_defaults(func=bench_open)
+
+    startup = subparsers.add_parser("startup", help="data_entry_system.py import time and time to menu")
+    startup.add_argument("--entries", type=int, default=100_000)
+    startup.add_argument("--runs", type=int, default=15)
+    startup.add_argument("--target-ms", type=float, default=75.0)
+    startup.set_defaults(func=bench_startup)
+
+    dungeon = subparsers.add_parser("dungeon", help="dungeon_stay.py headless simulation tick rate")
+    dungeon.add_argument("--ticks", type=int, default=20_000)
+    dungeon.add_argument("--seeds", type=int, default=3)
+    dungeon.set_defaults(func=bench_dungeon)
+
+    batch = subparsers.add_parser("dungeon-batch", help="dungeon_stay.py per-object vs NumPy enemy updates")
+    batch.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    batch.add_argument("--ticks", type=int, default=50)
+    batch.set_defaults(func=bench_dungeon_batch)
+
+    flow = subparsers.add_parser("dungeon-flow", help="dungeon_stay.py shared flow-field pathfinding per-tick cost")
+    flow.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000])
+    flow.add_argument("--map-size", type=int, nargs=2, default=[120, 60], metavar=("WIDTH", "HEIGHT"))
+    flow.add_argument("--ticks", type=int, default=50)
+    flow.set_defaults(func=bench_dungeon_flow)
+
+    alloc = subparsers.add_parser("dungeon-alloc", help="dungeon_stay.py memory per enemy, spawn time and tick rate")
+    alloc.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    alloc.add_argument("--ticks", type=int, default=20)
+    alloc.set_defaults(func=bench_dungeon_alloc)
+
+    calc = subparsers.add_parser("calculator", help="my.py --batch throughput, line by line vs NumPy chunks")
+    calc.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    calc.add_argument("--chunk-size", type=int, default=16384)
+    calc.set_defaults(func=bench_calculator)
+
+    formula = subparsers.add_parser("formula", help="my.py expression compile cost and rows/s per formula")
+    formula.add_argument("--formula", default="(a * b + c) / sqrt(a) - b % 7")
+    formula.add_argument("--rows", type=int, default=1_000_000)
+    formula.set_defaults(func=bench_formula)
+
+    catcher = subparsers.add_parser("stars", help="2nd.py star-catcher tick rate and frame time per terminal size")
+    catcher.add_argument("--terminals", type=lambda size: tuple(map(int, size.split("x"))), nargs="+",
+                         default=[(80, 24), (200, 60), (400, 120)], metavar="WIDTHxHEIGHT")
+    catcher.add_argument("--stars", type=int, nargs="+", default=[1, 100, 10_000])
+    catcher.add_argument("--ticks", type=int, default=20_000)
+    catcher.add_argument("--frames", type=int, default=200)
+    catcher.set_defaults(func=bench_stars)
+
+    overhead = subparsers.add_parser("profile-overhead", help="cost of instrumentation's @timed phases, off and on")
+    overhead.add_argument("--ticks", type=int, default=5_000)
+    overhead.add_argument("--enemies", type=int, default=20)
+    overhead.add_argument("--repeat", type=int, default=7)
+    overhead.set_defaults(func=bench_profile_overhead)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,1032 @@
-import json
+import contextlib
 import csv
+import gzip
+import heapq
+import io
+import itertools
+import json
+import os
 import re
-from datetime import datetime
-from simple_term_menu import TerminalMenu
-from tabulate import tabulate
-from colorama import Fore, Style, init
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta
 
-# Initialize colorama
-init(autoreset=True)
+from instrumentation import profiler, timed
+
+try:
+    import fcntl
+except ImportError:  # Windows: stores are not shared between processes there
+    fcntl = None
+
+# argparse, colorama, shutil, simple_term_menu, sqlite3 and the process pool
+# are imported where they are first used, so each run only pays for what it touches.
+
+
+class LazyColor:
+    """Stands in for colorama's Fore/Style and imports colorama on first use."""
+
+    initialised = False
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        import colorama
+        if not LazyColor.initialised:
+            colorama.init(autoreset=True)
+            LazyColor.initialised = True
+        value = getattr(getattr(colorama, self.name), attr)
+        setattr(self, attr, value)
+        return value
+
+
+Fore = LazyColor("Fore")
+Style = LazyColor("Style")
+
+
+class DuplicateEntryError(ValueError):
+    """Raised by a storage backend that enforces unique emails itself."""
+
+
+class FileLock:
+    """Advisory lock on ``<data_file>.lock`` shared by every process using the store.
+
+    Writers hold it exclusively; readers that only pick up other writers'
+    changes hold it shared. Acquisitions nest, so a method that already holds
+    the lock can call one that takes it again. On platforms without fcntl
+    the lock is a no-op.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.depth = 0
+        self.exclusive = False
+
+    @contextlib.contextmanager
+    def hold(self, exclusive=True):
+        if fcntl is None:
+            yield
+            return
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if self.depth == 0 or (exclusive and not self.exclusive):
+            fcntl.flock(self.fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self.exclusive = exclusive
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if self.depth == 0:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+                os.close(self.fd)
+                self.fd = None
+
+
+def file_identity(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def iter_json_array(file, read_size=1 << 16):
+    # Yields the items of the JSON array in file one at a time, reading it in
+    # read_size blocks, so memory is bounded by the largest item rather than
+    # the size of the file. Raises json.JSONDecodeError on malformed input.
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r"[ \t\n\r]*")
+    buffer = ""
+    pos = 0
+
+    def more():
+        nonlocal buffer, pos
+        block = file.read(read_size)
+        if block:
+            buffer = buffer[pos:] + block
+            pos = 0
+        return bool(block)
+
+    def token():
+        # The next character that is not whitespace, or "" at the end of the file.
+        nonlocal pos
+        while True:
+            pos = whitespace.match(buffer, pos).end()
+            if pos < len(buffer) or not more():
+                return buffer[pos:pos + 1]
+
+    if token() != "[":
+        raise json.JSONDecodeError("Expecting '['", buffer, pos)
+    pos += 1
+    if token() == "]":
+        pos += 1
+    else:
+        while True:
+            token()
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if more():
+                    continue
+                raise
+            after = whitespace.match(buffer, end).end()
+            if (after == len(buffer) or buffer[after] not in ",]") and more():
+                continue  # a number cut off by the block boundary, such as 4. of 4.5
+            yield item
+            pos = end
+            separator = token()
+            pos += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos - 1)
+    if token():
+        raise json.JSONDecodeError("Extra data", buffer, pos)
+
+
+class JSONFileStorage:
+    """Legacy backend: the whole store is one JSON array, rewritten on every save.
+
+    Other writers are detected by the file changing on disk; the caller then
+    reloads it before writing, so their entries are merged rather than lost.
+    """
+
+    queryable = False
+    appends = False  # entries only reach the file when it is rewritten
+    errors = (IOError,)
+
+    def __init__(self, data_file):
+        self.data_file = data_file
+        self.lock = FileLock(data_file + ".lock")
+        self.identity = None
+
+    def locked(self):
+        return self.lock.hold()
+
+    def load(self):
+        with self.lock.hold(exclusive=False):
+            self.identity = file_identity(self.data_file)
+            try:
+                with open(self.data_file, "r") as file:
+                    return json.load(file)
+            except FileNotFoundError:
+                return []
+
+    def iter_entries(self):
+        # One pass over the store straight from disk, without loading it. The
+        # file is rewritten in place, so other writers wait until it is done.
+        with self.lock.hold(exclusive=False):
+            try:
+                file = open(self.data_file, "r")
+            except FileNotFoundError:
+                return
+            with file:
+                yield from iter_json_array(file)
+
+    def refresh(self):
+        # None means "reload everything"; the format has no cheaper way to
+        # pick up another writer's changes.
+        return None if file_identity(self.data_file) != self.identity else []
+
+    def append(self, entry):
+        # Nothing to append to; should_compact() makes the caller rewrite the file.
+        pass
+
+    def append_many(self, entries):
+        return []
+
+    def sync(self):
+        pass
+
+    def should_compact(self):
+        return True
+
+    def save(self, entries):
+        with self.lock.hold():
+            with open(self.data_file, "w") as file:
+                json.dump(entries, file, indent=2, default=json_default)
+            self.identity = file_identity(self.data_file)
+
+    def close(self):
+        pass
+
+
+class JournalStorage:
+    """Append-only JSON-lines journal on top of a JSON snapshot.
+
+    New entries are appended to ``<data_file>.journal`` one line each and
+    fsync'd every ``sync_every`` appends. Once the journal holds
+    ``compact_every`` records it is folded into the snapshot, which keeps the
+    legacy ``user_data.json`` layout so either backend can open the store.
+
+    Several processes can share the store: appends happen under the store's
+    FileLock, and refresh() reads only the journal bytes added since this
+    process last looked. A replaced snapshot means another process compacted,
+    and the caller reloads.
+    """
+
+    queryable = False
+    appends = True
+    errors = (IOError,)
+
+    def __init__(self, data_file, sync_every=32, compact_every=5000):
+        self.data_file = data_file
+        self.journal_file = data_file + ".journal"
+        self.sync_every = sync_every
+        self.compact_every = compact_every
+        self.lock = FileLock(data_file + ".lock")
+        self.journal_records = 0
+        self.offset = 0
+        self.snapshot = None
+        self._unsynced = 0
+        self._journal = None
+
+    def locked(self):
+        return self.lock.hold()
+
+    def read_journal(self, offset):
+        # Returns the complete records after offset and the offset just past them.
+        records = []
+        try:
+            with open(self.journal_file, "rb") as journal:
+                journal.seek(offset)
+                for line in journal:
+                    if not line.endswith(b"\n"):
+                        break  # torn write from a crash
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    offset += len(line)
+                    records.append(record)
+        except FileNotFoundError:
+            pass
+        return records, offset
+
+    def load(self):
+        with self.lock.hold():
+            self.snapshot = file_identity(self.data_file)
+            try:
+                with open(self.data_file, "r") as file:
+                    entries = json.load(file)
+            except FileNotFoundError:
+                entries = []
+
+            records, self.offset = self.read_journal(0)
+            self.journal_records = len(records)
+            # A crash between writing a snapshot and truncating the journal leaves
+            # records that are already in the snapshot; emails are unique, so skip those.
+            seen = {entry["email"].casefold() for entry in entries}
+            for record in records:
+                email = record["email"].casefold()
+                if email not in seen:
+                    seen.add(email)
+                    entries.append(record)
+
+            if os.path.exists(self.journal_file) and self.offset < os.path.getsize(self.journal_file):
+                with open(self.journal_file, "r+b") as journal:
+                    journal.truncate(self.offset)
+                    os.fsync(journal.fileno())
+            return entries
+
+    def iter_entries(self):
+        # One pass over the store straight from disk, in the order load()
+        # returns it, without loading it. Only the journal, which compaction
+        # keeps short, is held in memory; the snapshot is streamed from a file
+        # opened under the lock, which stays readable if another process
+        # compacts meanwhile.
+        with self.lock.hold(exclusive=False):
+            try:
+                snapshot = open(self.data_file, "r")
+            except FileNotFoundError:
+                snapshot = io.StringIO("[]")
+            records, _ = self.read_journal(0)
+
+        journal_emails = {record["email"].casefold() for record in records}
+        seen = set()
+        with snapshot:
+            for entry in iter_json_array(snapshot):
+                email = entry["email"].casefold()
+                if email in journal_emails:
+                    seen.add(email)
+                yield entry
+        for record in records:
+            email = record["email"].casefold()
+            if email not in seen:
+                seen.add(email)
+                yield record
+
+    def refresh(self):
+        # Records other processes appended since we last read the journal, or
+        # None when the store was compacted underneath us and must be reloaded.
+        with self.lock.hold(exclusive=False):
+            if file_identity(self.data_file) != self.snapshot:
+                return None
+            size = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+            if size < self.offset:
+                return None
+            if size == self.offset:
+                return []
+            records, self.offset = self.read_journal(self.offset)
+            self.journal_records += len(records)
+            return records
+
+    def _open_journal(self):
+        if self._journal is None:
+            self._journal = open(self.journal_file, "ab")
+        return self._journal
+
+    def _write(self, data, count):
+        with self.lock.hold():
+            journal = self._open_journal()
+            # Callers refresh() under the same lock first, so anything past
+            # our offset is a torn record left by a writer that crashed. Cut
+            # it off, or load() would later truncate our records along with it.
+            if os.path.getsize(self.journal_file) > self.offset and not self.read_journal(self.offset)[0]:
+                journal.truncate(self.offset)
+            journal.write(data)
+            journal.flush()
+            self.offset = journal.tell()
+        self.journal_records += count
+        self._unsynced += count
+
+    def append(self, entry):
+        self._write(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n", 1)
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def append_many(self, entries):
+        # One write for the whole batch; the caller decides when to sync().
+        self._write(b"".join(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n"
+                             for entry in entries), len(entries))
+        return []
+
+    def sync(self):
+        if self._journal is not None and self._unsynced:
+            os.fsync(self._journal.fileno())
+            self._unsynced = 0
+
+    def should_compact(self):
+        return self.journal_records >= self.compact_every
+
+    def save(self, entries):
+        # Write the new snapshot beside the old one and swap it in atomically,
+        # then start an empty journal. One record per line keeps it a plain
+        # JSON array while letting json.dumps use its C encoder per record.
+        with self.lock.hold():
+            temp_file = self.data_file + ".tmp"
+            with open(temp_file, "w") as file:
+                file.write("[\n")
+                for start in range(0, len(entries), EXPORT_CHUNK_SIZE):
+                    chunk = entries[start:start + EXPORT_CHUNK_SIZE]
+                    file.write(("" if start == 0 else ",\n") + ",\n".join(json.dumps(entry, default=json_default) for entry in chunk))
+                file.write("\n]\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_file, self.data_file)
+            self.snapshot = file_identity(self.data_file)
+
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            with open(self.journal_file, "wb") as journal:
+                os.fsync(journal.fileno())
+            self.journal_records = 0
+            self.offset = 0
+            self._unsynced = 0
+
+    def close(self):
+        self.sync()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+class StoreWatcher(threading.Thread):
+    """Background thread that folds other writers' changes into a DataEntrySystem."""
+
+    def __init__(self, system, interval=2.0):
+        super().__init__(name="store-watcher", daemon=True)
+        self.system = system
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.system.refresh_entries()
+            except self.system.storage.errors + (ValueError,):
+                pass  # a half-written file; the next pass will see the whole thing
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class NGramIndex:
+    """Trigram inverted index for substring search over a few text fields.
+
+    Documents are identified by their position in the entry list. A query
+    walks the shortest posting list among its trigrams and verifies each
+    candidate, so only records sharing the query's rarest trigram are touched.
+    """
+
+    N = 3
 
-class DataEntrySystem:
     def __init__(self):
-        self.entries = []
-        self.data_file = "user_data.json"
-        self.load_entries()
+        self.postings = {}
+        self.documents = []
+
+    def add(self, *fields):
+        doc_id = len(self.documents)
+        fields = tuple(field.lower() for field in fields)
+        self.documents.append(fields)
+        n = self.N
+        postings = self.postings
+        for gram in {field[i:i + n] for field in fields for i in range(len(field) - n + 1)}:
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = [doc_id]
+            else:
+                posting.append(doc_id)
+        return doc_id
+
+    def candidates(self, term):
+        if len(term) < self.N:
+            return range(len(self.documents))
+        grams = {term[i:i + self.N] for i in range(len(term) - self.N + 1)}
+        return min((self.postings.get(gram, ()) for gram in grams), key=len)
+
+    def search(self, term, limit=None, ranked=False):
+        term = term.lower()
+        matches = []
+        for doc_id in self.candidates(term):
+            fields = self.documents[doc_id]
+            if any(term in field for field in fields):
+                matches.append(doc_id)
+                if limit is not None and not ranked and len(matches) >= limit:
+                    break
+
+        if ranked:
+            key = lambda doc_id: -self.score(term, self.documents[doc_id])
+            if limit is None:
+                matches.sort(key=key)
+            else:
+                matches = heapq.nsmallest(limit, matches, key=key)
+        return matches
+
+    @staticmethod
+    def score(term, fields):
+        # Whole-field matches beat prefixes beat plain substrings; earlier
+        # fields (name, then email) weigh more than later ones.
+        total = 0
+        for weight, field in zip((3, 2, 1), fields):
+            if field == term:
+                total += 3 * weight
+            elif field.startswith(term):
+                total += 2 * weight
+            elif term in field:
+                total += weight
+        return total
+
+
+ENTRY_FIELDS = ["name", "age", "email", "address", "timestamp"]
+EXPORT_FORMATS = ["csv", "json", "jsonl"]
+EXPORT_CHUNK_SIZE = 1000
+IMPORT_FORMATS = ["csv", "jsonl"]
+IMPORT_BATCH_SIZE = 10000
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
+def validate_record(row, timestamp):
+    # Applies the same rules as the interactive form; returns (entry, None)
+    # or (None, reason).
+    if not isinstance(row, dict):
+        return None, "unparseable record"
+    name = str(row.get("name") or "").strip()
+    if not name:
+        return None, "name is blank"
+    age = str(row.get("age") or "").strip()
+    if not (age.isdigit() and 1 <= int(age) <= 120):
+        return None, "age must be a number between 1 and 120"
+    email = str(row.get("email") or "").strip()
+    if EMAIL_PATTERN.match(email) is None:
+        return None, "invalid email format"
+    return {
+        "name": name,
+        "age": int(age),
+        "email": email.lower(),
+        "address": str(row.get("address") or "").strip() or "N/A",
+        "timestamp": str(row.get("timestamp") or "").strip() or timestamp,
+    }, None
+
+
+def validate_batch(batch, timestamp):
+    # Returns (entry, reason) for each (line number, row) in batch, in order;
+    # the caller keeps the raw rows, which keeps the results cheap to ship
+    # out of a worker.
+    return [validate_record(row, timestamp) for _, row in batch]
+
+
+def iter_import_rows(path, fmt):
+    # Yields (line number, row) pairs; rows that cannot be parsed come
+    # through as None so they are reported rather than aborting the import.
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", newline="", encoding="utf-8") as file:
+        if fmt == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError:
+                    yield line_no, None
+
+def short_address(address):
+    return address.split(",")[0][:20] + "..." if len(address) > 20 else address
+
+
+class PagedTable:
+    """Grid table that formats one page of rows at a time.
+
+    ``columns`` is a list of (header, width, getter, align) tuples. The widths
+    are fixed up front, so every page lines up the same way and rendering a
+    page never looks at rows outside it.
+    """
+
+    MAX_WIDTH = 30
+
+    def __init__(self, rows, columns, page_size=None):
+        self.rows = rows
+        self.columns = [(header, max(len(header), min(width, self.MAX_WIDTH)), getter, align)
+                        for header, width, getter, align in columns]
+        if page_size is None:
+            # Each row takes two lines in a grid; leave room for the title and prompt.
+            import shutil
+            page_size = max(5, (shutil.get_terminal_size().lines - 8) // 2)
+        self.page_size = page_size
+        self.page_count = max(1, -(-len(rows) // page_size))
+        self.rule = "+" + "+".join("-" * (width + 2) for _, width, _, _ in self.columns) + "+"
+
+    def format_row(self, cells):
+        formatted = []
+        for cell, (_, width, _, align) in zip(cells, self.columns):
+            text = str(cell)
+            if len(text) > width:
+                text = text[:width - 3] + "..."
+            formatted.append(text.rjust(width) if align == "right" else text.ljust(width))
+        return "| " + " | ".join(formatted) + " |"
+
+    def render_page(self, page):
+        start = page * self.page_size
+        stop = min(start + self.page_size, len(self.rows))
+        lines = [
+            self.rule,
+            self.format_row(header for header, _, _, _ in self.columns),
+            self.rule.replace("-", "="),
+        ]
+        for index in range(start, stop):
+            row = self.rows[index]
+            lines.append(self.format_row(getter(index, row) for _, _, getter, _ in self.columns))
+            lines.append(self.rule)
+        return "\n".join(lines)
+
+    def show(self):
+        page = 0
+        while True:
+            print(self.render_page(page))
+            if self.page_count == 1:
+                input("\nPress Enter to continue...")
+                return
+
+            choice = input(f"\nPage {page + 1}/{self.page_count} - "
+                           "[Enter/n]ext, [p]rev, page number, [q]uit: ").strip().lower()
+            if choice == "q" or (choice in ("", "n") and page == self.page_count - 1):
+                return
+            if choice in ("", "n"):
+                page += 1
+            elif choice == "p":
+                page = max(0, page - 1)
+            elif choice.isdigit() and 1 <= int(choice) <= self.page_count:
+                page = int(choice) - 1
+            else:
+                print(f"{Fore.RED}Enter n, p, q or a page number between 1 and {self.page_count}.{Style.RESET_ALL}")
+
+
+def json_default(value):
+    # Lets json serialise EntryColumns and the EntryView records it hands out.
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, Sequence):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class EntryView(Mapping):
+    """Read-only dict-style view of one record in an EntryColumns store."""
+
+    __slots__ = ("columns", "index")
+
+    def __init__(self, columns, index):
+        self.columns = columns
+        self.index = index
+
+    def __getitem__(self, key):
+        return self.columns.value(self.index, key)
+
+    def __iter__(self):
+        return iter(self.columns.fields(self.index))
+
+    def __len__(self):
+        return len(self.columns.fields(self.index))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class EntryColumns(Sequence):
+    """Column-oriented record store used by ``DataEntrySystem(compact=True)``.
+
+    Each field lives in its own list or array: names and addresses are
+    interned, ages are bytes and timestamps are integer epoch seconds.
+    Records that do not fit that shape (extra keys, an odd timestamp) are kept
+    as plain dicts on the side. Indexing returns EntryView objects, so code
+    written against the list of dicts keeps working.
+    """
+
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, entries=()):
+        self.names = []
+        self.ages = array("B")
+        self.emails = []
+        self.addresses = []
+        self.timestamps = array("q")
+        self.irregular = {}
+        self.extend(entries)
+
+    EPOCH = datetime(1970, 1, 1)
+    SECOND = timedelta(seconds=1)
+
+    @classmethod
+    def parse_timestamp(cls, text):
+        # Timestamps are naive wall-clock times, so they are stored as if they
+        # were UTC; only exact round trips are accepted.
+        try:
+            moment = datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                              int(text[11:13]), int(text[14:16]), int(text[17:19]))
+        except (TypeError, ValueError):
+            return None
+        seconds = (moment - cls.EPOCH) // cls.SECOND
+        if time.strftime(cls.TIME_FORMAT, time.gmtime(seconds)) != text:
+            return None
+        return seconds
+
+    def append(self, entry):
+        index = len(self.names)
+        age = entry.get("age")
+        seconds = self.parse_timestamp(entry.get("timestamp"))
+        regular = (len(entry) == len(ENTRY_FIELDS) and all(field in entry for field in ENTRY_FIELDS)
+                   and type(age) is int and 0 <= age <= 255 and seconds is not None)
+        if regular:
+            self.names.append(sys.intern(entry["name"]))
+            self.ages.append(age)
+            self.emails.append(entry["email"])
+            self.addresses.append(sys.intern(entry["address"]))
+            self.timestamps.append(seconds)
+        else:
+            self.irregular[index] = dict(entry)
+            self.names.append(None)
+            self.ages.append(0)
+            self.emails.append(None)
+            self.addresses.append(None)
+            self.timestamps.append(0)
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def fields(self, index):
+        if index in self.irregular:
+            return self.irregular[index].keys()
+        return ENTRY_FIELDS
+
+    def value(self, index, key):
+        if self.irregular and index in self.irregular:
+            return self.irregular[index][key]
+        if key == "name":
+            return self.names[index]
+        if key == "age":
+            return self.ages[index]
+        if key == "email":
+            return self.emails[index]
+        if key == "address":
+            return self.addresses[index]
+        if key == "timestamp":
+            return time.strftime(self.TIME_FORMAT, time.gmtime(self.timestamps[index]))
+        raise KeyError(key)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [EntryView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("entry index out of range")
+        return EntryView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield EntryView(self, index)
+
+
+class SQLiteEntries(Sequence):
+    """Lazy sequence over the rows of a SQLiteStorage, in insertion order."""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def __len__(self):
+        return self.storage.count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self.storage.rows_between(start, stop)
+        if index < 0:
+            index += len(self)
+        entry = self.storage.row(index) if index >= 0 else None
+        if entry is None:
+            raise IndexError("entry index out of range")
+        return entry
+
+    def __iter__(self):
+        return self.storage.iter_rows()
+
+
+class SQLiteStorage:
+    """SQLite database backend.
+
+    Lookups and searches run as indexed queries, so nothing is loaded at
+    startup; load() returns a lazy SQLiteEntries view. Rows are only ever
+    appended, so row ids run 1..N and double as list positions. Name and
+    email column widths are kept in a meta table by an insert trigger.
+    An existing JSON or journal store at ``data_file`` is imported once, the
+    first time the database is opened with one present.
+    """
+
+    queryable = True
+    appends = True
+    COLUMNS = ", ".join(ENTRY_FIELDS)
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            email TEXT NOT NULL,
+            address TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS entries_email ON entries (lower(email));
+        CREATE INDEX IF NOT EXISTS entries_name ON entries (name COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS entries_age ON entries (age);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        INSERT OR IGNORE INTO meta VALUES ('name_width', 0), ('email_width', 0);
+        CREATE TRIGGER IF NOT EXISTS entries_widths AFTER INSERT ON entries BEGIN
+            UPDATE meta SET value = max(value, length(NEW.name)) WHERE key = 'name_width';
+            UPDATE meta SET value = max(value, length(NEW.email)) WHERE key = 'email_width';
+        END;
+    """
+    MMAP_SIZE = 256 * 1024 * 1024
+    BUSY_TIMEOUT = 30  # seconds
+    INSERT = "INSERT INTO entries (name, age, email, address, timestamp) VALUES (?, ?, ?, ?, ?)"
+    INSERT_NEW = INSERT.replace("INSERT", "INSERT OR IGNORE", 1)  # skips emails already stored
+    # Searches match on str.lower(), as NGramIndex does. LIKE only folds ASCII
+    # letters, so it serves ASCII terms, and rows holding other characters
+    # (more bytes than characters) are checked in Python as well.
+    SEARCH = f"SELECT {COLUMNS} FROM entries WHERE contains_lower(:term, name, email, address) ORDER BY id"
+    SEARCH_ASCII = (f"SELECT {COLUMNS} FROM entries WHERE name LIKE :pattern ESCAPE '\\' "
+                    "OR email LIKE :pattern ESCAPE '\\' OR address LIKE :pattern ESCAPE '\\' "
+                    "OR ((length(CAST(name AS BLOB)) > length(name) OR length(CAST(email AS BLOB)) > length(email) "
+                    "OR length(CAST(address AS BLOB)) > length(address)) "
+                    "AND contains_lower(:term, name, email, address)) ORDER BY id")
+
+    def __init__(self, data_file):
+        import sqlite3
+        self.errors = (IOError, sqlite3.Error)
+        self.data_file = data_file
+        base, ext = os.path.splitext(data_file)
+        self.db_file = data_file if ext in (".db", ".sqlite", ".sqlite3") else base + ".sqlite3"
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            import sqlite3
+            # Statements are prepared once and reused from the module's statement cache.
+            # Another process's write transaction makes us wait up to BUSY_TIMEOUT.
+            self._connection = sqlite3.connect(self.db_file, timeout=self.BUSY_TIMEOUT, cached_statements=64)
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            # Read pages straight from a memory map instead of copying them in.
+            self._connection.execute(f"PRAGMA mmap_size={self.MMAP_SIZE}")
+            self._connection.create_function("contains_lower", 4, self.contains_lower, deterministic=True)
+            # Creating the schema writes to the database, so an existing store
+            # is only read here; opening it never waits on a running import.
+            if self._connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'meta'").fetchone() is None:
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.executescript(self.SCHEMA)
+            if self.db_file != self.data_file:
+                self.migrate()
+        return self._connection
+
+    def migrate(self):
+        # Imports the JSON or journal store at data_file unless meta says that
+        # was done; the store may be a journal with no snapshot written yet.
+        connection = self._connection
+        migrated = "SELECT 1 FROM meta WHERE key = 'migrated'"
+        journal = JournalStorage(self.data_file)
+        if connection.execute(migrated).fetchone() is not None:
+            return
+        if not (os.path.exists(self.data_file) or os.path.exists(journal.journal_file)):
+            return
+        with connection:
+            # Only one process migrates; the others wait here, then find it done.
+            connection.execute("BEGIN IMMEDIATE")
+            if connection.execute(migrated).fetchone() is None:
+                connection.executemany(self.INSERT_NEW, map(self.to_row, journal.load()))
+                connection.execute("INSERT INTO meta VALUES ('migrated', 1)")
+
+    @staticmethod
+    def contains_lower(term, *fields):
+        return any(term in field.lower() for field in fields)
+
+    @staticmethod
+    def to_row(entry):
+        return tuple(entry[field] for field in ENTRY_FIELDS)
+
+    @staticmethod
+    def to_entry(row):
+        return dict(zip(ENTRY_FIELDS, row))
+
+    def load(self):
+        self.connection
+        return SQLiteEntries(self)
+
+    def iter_entries(self):
+        stores = (self.db_file, self.data_file, self.data_file + ".journal")
+        if self._connection is None and not any(map(os.path.exists, stores)):
+            return iter(())  # no store yet; do not create an empty database just to read it
+        return self.iter_rows()
+
+    def locked(self):
+        # SQLite serialises writers itself; the unique email index rejects races.
+        return contextlib.nullcontext()
+
+    def refresh(self):
+        return []
+
+    def count(self):
+        return self.connection.execute("SELECT max(id) FROM entries").fetchone()[0] or 0
+
+    def row(self, index):
+        row = self.connection.execute(f"SELECT {self.COLUMNS} FROM entries WHERE id = ?", (index + 1,)).fetchone()
+        return None if row is None else self.to_entry(row)
+
+    def rows_between(self, start, stop):
+        rows = self.connection.execute(f"SELECT {self.COLUMNS} FROM entries WHERE id > ? AND id <= ? ORDER BY id",
+                                       (start, stop))
+        return [self.to_entry(row) for row in rows]
+
+    def iter_rows(self, batch_size=EXPORT_CHUNK_SIZE):
+        cursor = self.connection.execute(f"SELECT {self.COLUMNS} FROM entries ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield self.to_entry(row)
+
+    def column_widths(self):
+        widths = dict(self.connection.execute("SELECT key, value FROM meta"))
+        return {"name": widths["name_width"], "email": widths["email_width"]}
+
+    def find_by_email(self, email):
+        row = self.connection.execute(f"SELECT {self.COLUMNS} FROM entries WHERE lower(email) = ?",
+                                      (email.lower(),)).fetchone()
+        return None if row is None else self.to_entry(row)
+
+    def search(self, term, limit=None, ranked=False):
+        term = term.lower()
+        pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        sql = self.SEARCH_ASCII if term.isascii() else self.SEARCH
+        if limit is not None and not ranked:
+            sql += f" LIMIT {int(limit)}"
+        matches = (self.to_entry(row) for row in self.connection.execute(sql, {"term": term, "pattern": pattern}))
+        if not ranked:
+            return list(matches)
+        key = lambda entry: -NGramIndex.score(
+            term, (entry["name"].lower(), entry["email"].lower(), entry["address"].lower()))
+        return sorted(matches, key=key) if limit is None else heapq.nsmallest(limit, matches, key=key)
+
+    def entries_by_age(self, min_age, max_age):
+        rows = self.connection.execute(
+            f"SELECT {self.COLUMNS} FROM entries WHERE age BETWEEN ? AND ? ORDER BY age, id", (min_age, max_age))
+        return (self.to_entry(row) for row in rows)
+
+    def append(self, entry):
+        import sqlite3
+        try:
+            with self.connection:
+                self.connection.execute(self.INSERT, self.to_row(entry))
+        except sqlite3.IntegrityError:
+            raise DuplicateEntryError(entry["email"]) from None
+
+    def append_many(self, entries):
+        # One transaction per batch, so other processes can write (and open
+        # the store) between the batches of a long import. Returns the entries
+        # left out because another writer stored their email meanwhile.
+        import sqlite3
+        try:
+            with self.connection:
+                self.connection.executemany(self.INSERT, map(self.to_row, entries))
+            return []
+        except sqlite3.IntegrityError:
+            pass
+        # The batch was rolled back; store it again row by row, skipping those.
+        left_out = []
+        with self.connection:
+            for entry in entries:
+                if self.connection.execute(self.INSERT_NEW, self.to_row(entry)).rowcount == 0:
+                    left_out.append(entry)
+        return left_out
+
+    def sync(self):
+        self.connection.commit()
+
+    def should_compact(self):
+        return False
+
+    def save(self, entries):
+        # Every row is committed as it is added; there is nothing to rewrite.
+        self.sync()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.commit()
+            self._connection.close()
+            self._connection = None
+
+
+STORAGE_BACKENDS = {
+    "journal": JournalStorage,
+    "json": JSONFileStorage,
+    "sqlite": SQLiteStorage,
+}
+
+
+class DataEntrySystem:
+    def __init__(self, data_file="user_data.json", storage=None, compact=False):
+        self._entries = None
+        self.data_file = data_file
+        self.compact = compact
+        if storage is None:
+            backend = os.environ.get("DATA_ENTRY_BACKEND", "journal")
+            storage = STORAGE_BACKENDS[backend](data_file)
+        self.storage = storage
+        self.email_index = {}
+        self.search_index = None
+        self.column_widths = {}
+        # Guards the in-memory store against the StoreWatcher thread.
+        self.lock = threading.RLock()
+        self.watcher = None
+
+    @property
+    def entries(self):
+        # The store is read on first use rather than in the constructor, so
+        # the menu comes up before a large store has been parsed.
+        if self._entries is None:
+            self.load_entries()
+        return self._entries
+
+    @entries.setter
+    def entries(self, entries):
+        self._entries = entries
 
     def display_welcome(self):
         print(f"\n{Fore.CYAN}{' DATA ENTRY SYSTEM v3.0 (Python) '.center(50, '═')}{Style.RESET_ALL}")
@@ -23,29 +1036,220 @@ class DataEntrySystem:
         print(f"\n{Fore.CYAN}{' Thank you for using DataEntrySystem! '.center(50, '═')}{Style.RESET_ALL}")
         print(f"{Fore.LIGHTBLACK_EX}Your data has been safely stored.{Style.RESET_ALL}")
 
+    @timed("load_entries")
     def load_entries(self):
-        try:
-            with open(self.data_file, "r") as file:
-                self.entries = json.load(file)
-        except FileNotFoundError:
-            self.entries = []
-        except json.JSONDecodeError:
-            print(f"{Fore.RED}Error: Corrupted data file. Starting with empty database.{Style.RESET_ALL}")
-            self.entries = []
+        with self.lock:
+            try:
+                entries = self.storage.load()
+            except json.JSONDecodeError:
+                print(f"{Fore.RED}Error: Corrupted data file. Starting with empty database.{Style.RESET_ALL}")
+                entries = []
+            if self.compact and not self.storage.queryable:
+                entries = EntryColumns(entries)
+            self.entries = entries
+            profiler.count("entries_loaded", len(entries))
+            self.build_indexes()
+
+    @timed("refresh_entries")
+    def refresh_entries(self):
+        # Folds in entries other processes have written since we last looked.
+        with self.lock:
+            if self._entries is None:
+                self.load_entries()
+                return
+            changes = self.storage.refresh()
+            if changes is None:
+                self.load_entries()
+                return
+            for entry in changes:
+                if not self.email_exists(entry["email"]):
+                    self.entries.append(entry)
+                    self.index_entry(entry, len(self.entries) - 1)
+
+    @timed("build_indexes")
+    def build_indexes(self):
+        if self.storage.queryable:
+            # The database keeps its own indexes.
+            self.email_index = {}
+            self.column_widths = self.storage.column_widths()
+            return
+        # The email index maps to positions in self.entries rather than to the
+        # records themselves, which works the same for dicts and EntryColumns.
+        self.email_index = {entry["email"].casefold(): index for index, entry in enumerate(self.entries)}
+        self.column_widths = {
+            field: max((len(entry[field]) for entry in self.entries), default=0)
+            for field in ("name", "email")
+        }
+        # The trigram index is the expensive one; it is built on the first search.
+        self.search_index = None
 
+    def index_entry(self, entry, index):
+        for field in ("name", "email"):
+            if len(entry[field]) > self.column_widths[field]:
+                self.column_widths[field] = len(entry[field])
+        if self.storage.queryable:
+            return
+        self.email_index[entry["email"].casefold()] = index
+        if self.search_index is not None:
+            self.search_index.add(entry["name"], entry["email"], entry["address"])
+
+    @timed("build_search_index")
+    def build_search_index(self):
+        with self.lock:
+            search_index = NGramIndex()
+            for entry in self.entries:
+                search_index.add(entry["name"], entry["email"], entry["address"])
+            self.search_index = search_index
+
+    @timed("save_entries")
     def save_entries(self):
         try:
-            with open(self.data_file, "w") as file:
-                json.dump(self.entries, file, indent=2)
-        except IOError as e:
+            # Pick up other writers first so the rewrite does not drop their entries.
+            with self.lock, self.storage.locked():
+                self.refresh_entries()
+                self.storage.save(self.entries)
+        except self.storage.errors as e:
+            print(f"{Fore.RED}Error saving data: {e}{Style.RESET_ALL}")
+
+    @timed("append_entry")
+    def append_entry(self, entry):
+        # Returns False if another writer has added the same email meanwhile,
+        # and None if the storage failed; the entry is then not added.
+        with self.lock, self.storage.locked():
+            self.refresh_entries()
+            if self.email_exists(entry["email"]):
+                return False
+            try:
+                self.storage.append(entry)
+            except DuplicateEntryError:
+                return False
+            except self.storage.errors as e:
+                print(f"{Fore.RED}Error saving data: {e}{Style.RESET_ALL}")
+                return None
+            if not self.storage.queryable:
+                self.entries.append(entry)
+            self.index_entry(entry, len(self.entries) - 1)
+            if self.storage.should_compact():
+                self.save_entries()
+        return True
+
+    def append_entries(self, entries):
+        # Returns the entries the storage left out as duplicates.
+        left_out = self.storage.append_many(entries)
+        if left_out:
+            duplicates = set(map(id, left_out))
+            entries = [entry for entry in entries if id(entry) not in duplicates]
+        if not self.storage.queryable:
+            self.entries.extend(entries)
+        for index, entry in enumerate(entries, len(self.entries) - len(entries)):
+            self.index_entry(entry, index)
+        return left_out
+
+    @timed("import_entries")
+    def import_entries(self, rows, batch_size=IMPORT_BATCH_SIZE, workers=1, on_reject=None):
+        # Validates (line number, row) pairs in batches, optionally across a
+        # process pool, drops emails already in the store or earlier in the
+        # input, and syncs the storage once at the end. A backend that does not
+        # append keeps the batches in memory until the final save, where a
+        # reload to pick up another writer's save would drop them, so other
+        # writers are kept out for the whole import instead.
+        with contextlib.nullcontext() if self.storage.appends else self.storage.locked():
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            batches = iter(lambda: list(itertools.islice(rows, batch_size)), [])
+            imported = rejected = 0
+
+            def commit(batch, results):
+                with self.lock, self.storage.locked():
+                    self.refresh_entries()
+                    commit_batch(batch, results)
+
+            def commit_batch(batch, results):
+                nonlocal imported
+                accepted = []
+                seen = set()
+                for (line_no, row), (entry, reason) in zip(batch, results):
+                    if entry is not None:
+                        email = entry["email"].casefold()
+                        if email in seen or self.email_exists(email):
+                            entry, reason = None, "duplicate email"
+                        else:
+                            seen.add(email)
+                            accepted.append((line_no, row, entry))
+                            continue
+                    reject(line_no, row, reason)
+                # Another process may still store one of these emails first.
+                left_out = set(map(id, self.append_entries([entry for _, _, entry in accepted])))
+                for line_no, row, entry in accepted:
+                    if id(entry) in left_out:
+                        reject(line_no, row, "duplicate email")
+                imported += len(accepted) - len(left_out)
+
+            def reject(line_no, row, reason):
+                nonlocal rejected
+                rejected += 1
+                if on_reject is not None:
+                    on_reject(line_no, row, reason)
+
+            if workers > 1:
+                # Keep a bounded number of batches in flight so a huge input is
+                # never read into memory ahead of the workers.
+                from concurrent.futures import ProcessPoolExecutor
+                with ProcessPoolExecutor(workers) as pool:
+                    pending = deque()
+                    for batch in batches:
+                        pending.append((batch, pool.submit(validate_batch, batch, timestamp)))
+                        if len(pending) >= 2 * workers:
+                            batch, results = pending.popleft()
+                            commit(batch, results.result())
+                    while pending:
+                        batch, results = pending.popleft()
+                        commit(batch, results.result())
+            else:
+                for batch in batches:
+                    commit(batch, validate_batch(batch, timestamp))
+
+            if self.storage.should_compact():
+                self.save_entries()
+            self.storage.sync()
+            return imported, rejected
+
+    def start_watcher(self, interval=2.0):
+        if self.storage.queryable or self.watcher is not None:
+            return
+        self.watcher = StoreWatcher(self, interval)
+        self.watcher.start()
+
+    def close(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        try:
+            with self.lock:
+                self.storage.close()
+        except self.storage.errors as e:
             print(f"{Fore.RED}Error saving data: {e}{Style.RESET_ALL}")
 
     def validate_email(self, email):
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return EMAIL_PATTERN.match(email) is not None
+
+    def find_by_email(self, email):
+        if self.storage.queryable:
+            return self.storage.find_by_email(email)
+        # The lock keeps the StoreWatcher from swapping the entries and their
+        # indexes between the lookup and the read.
+        with self.lock:
+            if self._entries is None:
+                self.load_entries()
+            index = self.email_index.get(email.casefold())
+            return None if index is None else self.entries[index]
 
     def email_exists(self, email):
-        return any(entry['email'].lower() == email.lower() for entry in self.entries)
+        if self.storage.queryable:
+            return self.storage.find_by_email(email) is not None
+        with self.lock:
+            if self._entries is None:
+                self.load_entries()
+            return email.casefold() in self.email_index
 
     def add_new_entry(self):
         while True:
@@ -74,16 +1278,18 @@ class DataEntrySystem:
 
             address = input(f"{Fore.BLUE}Physical Address (optional):{Style.RESET_ALL} ").strip() or "N/A"
 
-            self.entries.append({
+            added = self.append_entry({
                 "name": name,
                 "age": int(age),  # Store as integer
                 "email": email.lower(),  # Store in lowercase for consistency
                 "address": address,
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             })
-            self.save_entries()
 
-            print(f"\n{Fore.GREEN}✓ Entry added successfully!{Style.RESET_ALL}")
+            if added:
+                print(f"\n{Fore.GREEN}✓ Entry added successfully!{Style.RESET_ALL}")
+            elif added is False:
+                print(f"\n{Fore.RED}Email was just added by another user!{Style.RESET_ALL}")
 
             if input("\nAdd another entry? (y/n): ").lower() != 'y':
                 break
@@ -94,37 +1300,39 @@ class DataEntrySystem:
             return
 
         print(f"\n{Fore.CYAN}{' ALL ENTRIES '.center(50, '═')}{Style.RESET_ALL}")
-        
-        headers = ["#", "Name", "Age", "Email", "Address", "Added On"]
-        table_data = []
-        
-        for idx, entry in enumerate(self.entries, 1):
-            table_data.append([
-                idx,
-                entry["name"],
-                entry["age"],
-                entry["email"],
-                entry["address"].split(",")[0][:20] + "..." if len(entry["address"]) > 20 else entry["address"],
-                entry["timestamp"]
-            ])
-        
-        print(tabulate(table_data, headers=headers, tablefmt="grid"))
-        input("\nPress Enter to continue...")
+        self.entry_table(self.entries, with_timestamp=True).show()
+
+    def entry_table(self, rows, with_timestamp=False):
+        columns = [
+            ("#", len(str(len(rows))), lambda idx, entry: idx + 1, "right"),
+            ("Name", self.column_widths["name"], lambda idx, entry: entry["name"], "left"),
+            ("Age", 3, lambda idx, entry: entry["age"], "right"),
+            ("Email", self.column_widths["email"], lambda idx, entry: entry["email"], "left"),
+            ("Address", 23, lambda idx, entry: short_address(entry["address"]), "left"),
+        ]
+        if with_timestamp:
+            columns.append(("Added On", 19, lambda idx, entry: entry["timestamp"], "left"))
+        return PagedTable(rows, columns)
 
     def search_entries(self):
         if not self.entries:
             print(f"\n{Fore.YELLOW}No entries found. Please add some data first.{Style.RESET_ALL}")
             return
 
-        search_term = input("\nSearch by name, email, or address: ").lower()
-        results = [
-            entry for entry in self.entries
-            if (search_term in entry["name"].lower() or
-                search_term in entry["email"].lower() or
-                search_term in entry["address"].lower())
-        ]
+        search_term = input("\nSearch by name, email, or address: ")
+        self.display_search_results(self.find_entries(search_term, ranked=True))
 
-        self.display_search_results(results)
+    @timed("find_entries")
+    def find_entries(self, term, limit=None, ranked=False):
+        if self.storage.queryable:
+            results = self.storage.search(term, limit, ranked)
+        else:
+            with self.lock:
+                if self.search_index is None:
+                    self.build_search_index()
+                results = [self.entries[doc_id] for doc_id in self.search_index.search(term, limit, ranked)]
+        profiler.count("search_results", len(results))
+        return results
 
     def display_search_results(self, results):
         if not results:
@@ -132,52 +1340,90 @@ class DataEntrySystem:
             return
 
         print(f"\n{Fore.CYAN}{' SEARCH RESULTS '.center(50, '═')}{Style.RESET_ALL}")
-        
-        headers = ["#", "Name", "Age", "Email", "Address"]
-        table_data = []
-        
-        for idx, entry in enumerate(results, 1):
-            table_data.append([
-                idx,
-                entry["name"],
-                entry["age"],
-                entry["email"],
-                entry["address"].split(",")[0][:20] + "..." if len(entry["address"]) > 20 else entry["address"]
-            ])
-        
-        print(tabulate(table_data, headers=headers, tablefmt="grid"))
-        input("\nPress Enter to continue...")
+        self.entry_table(results).show()
 
     def export_data(self):
         if not self.entries:
             print(f"\n{Fore.YELLOW}No entries to export.{Style.RESET_ALL}")
             return
 
-        options = ["JSON", "CSV", "Cancel"]
+        options = ["JSON", "JSON Lines", "CSV", "Cancel"]
+        formats = ["json", "jsonl", "csv"]
+        from simple_term_menu import TerminalMenu
         terminal_menu = TerminalMenu(options, title="Select export format:")
         choice_index = terminal_menu.show()
 
-        if choice_index is None or choice_index == 2:
+        if choice_index is None or choice_index == 3:
             print(f"\n{Fore.YELLOW}Export cancelled.{Style.RESET_ALL}")
             return
 
+        fmt = formats[choice_index]
         try:
-            if choice_index == 0:  # JSON
-                with open("export.json", "w") as file:
-                    json.dump(self.entries, file, indent=2)
-                print(f"\n{Fore.GREEN}✓ Data exported to export.json{Style.RESET_ALL}")
-            elif choice_index == 1:  # CSV
-                with open("export.csv", "w", newline="") as file:
-                    writer = csv.DictWriter(file, fieldnames=self.entries[0].keys())
-                    writer.writeheader()
-                    writer.writerows(self.entries)
-                print(f"\n{Fore.GREEN}✓ Data exported to export.csv{Style.RESET_ALL}")
+            self.export_entries(f"export.{fmt}", fmt)
+            print(f"\n{Fore.GREEN}✓ Data exported to export.{fmt}{Style.RESET_ALL}")
         except Exception as e:
             print(f"\n{Fore.RED}Error during export: {e}{Style.RESET_ALL}")
 
         input("\nPress Enter to continue...")
 
+    def stored_entries(self):
+        # The entries in memory once the store is loaded; until then one pass
+        # streamed from storage, which leaves it unloaded.
+        return self.storage.iter_entries() if self._entries is None else self.entries
+
+    def iter_export_chunks(self, fmt, entries, chunk_size=EXPORT_CHUNK_SIZE):
+        # Yields the export as text chunks of at most chunk_size records each,
+        # so memory use does not depend on the number of entries.
+        if fmt == "json":
+            yield "["
+        elif fmt == "csv":
+            yield ",".join(ENTRY_FIELDS) + "\r\n"
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        first = True
+        pending = 0
+        for entry in entries:
+            if fmt == "csv":
+                writer.writerow([entry.get(field, "") for field in ENTRY_FIELDS])
+            elif fmt == "jsonl":
+                buffer.write(json.dumps(entry, default=json_default) + "\n")
+            else:
+                # Same layout json.dump(entries, indent=2) produced.
+                buffer.write(("\n  " if first else ",\n  ") + json.dumps(entry, indent=2, default=json_default).replace("\n", "\n  "))
+                first = False
+            pending += 1
+            if pending >= chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if pending:
+            yield buffer.getvalue()
+
+        if fmt == "json":
+            yield "]" if first else "\n]"
+
+    @timed("export_entries")
+    def export_entries(self, path, fmt, compress=False, chunk_size=EXPORT_CHUNK_SIZE):
+        # Returns the number of entries written.
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        exported = 0
+
+        def counted(entries):
+            nonlocal exported
+            for exported, entry in enumerate(entries, 1):
+                yield entry
+
+        opener = gzip.open if compress else open
+        with opener(path, "wt", newline="", encoding="utf-8") as file:
+            for chunk in self.iter_export_chunks(fmt, counted(self.stored_entries()), chunk_size):
+                file.write(chunk)
+        return exported
+
     def main_menu(self):
+        from simple_term_menu import TerminalMenu
         options = [
             "Add New Entry",
             "View All Entries",
@@ -208,14 +1454,112 @@ class DataEntrySystem:
 
     def run(self):
         self.display_welcome()
-        self.main_menu()
+        self.start_watcher()
+        try:
+            self.main_menu()
+        finally:
+            self.close()
         self.display_goodbye()
 
-if __name__ == "__main__":
+def open_system(args):
+    return DataEntrySystem(args.data_file, STORAGE_BACKENDS[args.backend](args.data_file), args.compact)
+
+
+def run_export(args):
+    system = open_system(args)
+    compress = args.gzip or args.out.endswith(".gz")
+    try:
+        exported = system.export_entries(args.out, args.format, compress, args.chunk_size)
+    except (ValueError,) + system.storage.errors as e:
+        print(f"Error during export: {e}", file=sys.stderr)
+        return 1
+    finally:
+        system.close()
+    print(f"Exported {exported} entries to {args.out}")
+    return 0
+
+
+def run_import(args):
+    fmt = args.format or ("jsonl" if args.input.removesuffix(".gz").endswith((".jsonl", ".ndjson")) else "csv")
+    system = open_system(args)
+    rejects_file = open(args.rejects, "w", newline="", encoding="utf-8") if args.rejects else None
+    rejects = csv.writer(rejects_file) if rejects_file else None
+    if rejects:
+        rejects.writerow(["line", "reason", "row"])
+
+    def on_reject(line_no, row, reason):
+        if rejects:
+            rejects.writerow([line_no, reason, json.dumps(row)])
+
+    start = datetime.now()
     try:
-        system = DataEntrySystem()
+        imported, rejected = system.import_entries(
+            iter_import_rows(args.input, fmt), args.batch_size, args.workers, on_reject)
+    except (csv.Error,) + system.storage.errors as e:
+        print(f"Error during import: {e}", file=sys.stderr)
+        return 1
+    finally:
+        system.close()
+        if rejects_file:
+            rejects_file.close()
+    elapsed = (datetime.now() - start).total_seconds() or 1e-9
+    print(f"Imported {imported} entries, rejected {rejected} rows "
+          f"({(imported + rejected) / elapsed:,.0f} rows/s)")
+    return 0
+
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Data Entry System")
+    parser.add_argument("--data-file", default="user_data.json", help="path to the data store")
+    parser.add_argument("--backend", choices=sorted(STORAGE_BACKENDS),
+                        default=os.environ.get("DATA_ENTRY_BACKEND", "journal"),
+                        help="storage backend (default: journal)")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep records in a columnar store to cut memory use on large stores")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="time loads, saves and searches and write a summary to PATH on exit "
+                             "(.pstats: a cProfile dump; or set TOOLS_PROFILE=PATH)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    export = subparsers.add_parser("export", help="export the store without the interactive menu")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    export.add_argument("--out", required=True, help="output file; a .gz suffix implies --gzip")
+    export.add_argument("--gzip", action="store_true", help="gzip-compress the output")
+    export.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE,
+                        help="records written per chunk (default: %(default)s)")
+    export.set_defaults(func=run_export)
+
+    bulk = subparsers.add_parser("import", help="bulk-import records from a CSV or JSON Lines file")
+    bulk.add_argument("input", help="input file (.csv, .jsonl, optionally .gz)")
+    bulk.add_argument("--format", choices=IMPORT_FORMATS, help="input format (default: from the file name)")
+    bulk.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE,
+                      help="rows validated per batch (default: %(default)s)")
+    bulk.add_argument("--workers", type=int, default=1, help="validation processes (default: %(default)s)")
+    bulk.add_argument("--rejects", help="write rejected rows with the reason to this CSV file")
+    bulk.set_defaults(func=run_import)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # A bare interactive launch skips argument parsing altogether.
+    args = parse_args(argv) if argv else None
+    if args and args.profile:
+        profiler.enable(args.profile)
+    if args and args.command:
+        return args.func(args)
+
+    try:
+        system = open_system(args) if args else DataEntrySystem()
         system.run()
     except KeyboardInterrupt:
         print(f"\n{Fore.RED}Operation cancelled by user. Goodbye!{Style.RESET_ALL}")
     except Exception as e:
-        print(f"\n{Fore.RED}An unexpected error occurred: {e}{Style.RESET_ALL}")
\ No newline at end of file
+        print(f"\n{Fore.RED}An unexpected error occurred: {e}{Style.RESET_ALL}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
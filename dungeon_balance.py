@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Monte Carlo balance runs for dungeon_stay.py.
+
+Plays many seeded headless games per player policy, optionally over a grid
+of stat overrides, across a process pool, and reports the distribution of
+waves reached and scores.
+
+    python dungeon_balance.py --games 2000 --set health.orc=30,40,60 --set trap=15,25 --json sweep.json
+"""
+import argparse
+import csv
+import curses
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+from dungeon_stay import DEFAULT_RULES, RandomInput, Rules, Simulation, run_headless
+
+
+def current_stats(rules=DEFAULT_RULES):
+    stats = {f"health.{kind.name}": kind.health for kind in rules.enemies}
+    # One strength range for every enemy type, as the sweep knobs assume
+    stats["strength.min"], stats["strength.max"] = rules.enemies[0].strength
+    stats.update({f"weapon.{kind.name}": kind.damage for kind in rules.weapons})
+    stats["trap"] = rules.trap_damage
+    return stats
+
+
+DEFAULT_STATS = current_stats()
+
+
+def rules_from_stats(stats, rules=DEFAULT_RULES):
+    strength = (stats["strength.min"], stats["strength.max"])
+    return Rules(
+        enemies=tuple(kind._replace(health=stats[f"health.{kind.name}"], strength=strength)
+                      for kind in rules.enemies),
+        weapons=tuple(kind._replace(damage=stats[f"weapon.{kind.name}"]) for kind in rules.weapons),
+        trap_damage=stats["trap"],
+    )
+
+
+class TurtlePolicy:
+    """Stands still, drops each trap as soon as it has one and otherwise attacks."""
+
+    def __call__(self, sim):
+        return ord('t') if sim.player.traps else ord('a')
+
+
+class HunterPolicy:
+    """Fights anything adjacent, otherwise walks to the nearest weapon, then the nearest enemy."""
+
+    def __call__(self, sim):
+        player = sim.player
+        if sim.enemy_grid.around(player.x, player.y):
+            return ord('a')
+        if player.traps:
+            return ord('t')
+        targets = sim.weapons or sim.enemies
+        if not targets:
+            return -1
+        target = min(targets, key=lambda obj: max(abs(obj.x - player.x), abs(obj.y - player.y)))
+        dx, dy = target.x - player.x, target.y - player.y
+        if abs(dx) >= abs(dy) and dx:
+            return curses.KEY_RIGHT if dx > 0 else curses.KEY_LEFT
+        if dy:
+            return curses.KEY_DOWN if dy > 0 else curses.KEY_UP
+        return -1
+
+
+POLICIES = {
+    "random": RandomInput,
+    "turtle": lambda seed: TurtlePolicy(),
+    "hunter": lambda seed: HunterPolicy(),
+}
+
+
+def play_game(task):
+    label, stats, policy, seed, max_ticks = task
+    sim = run_headless(Simulation(seed, rules=rules_from_stats(stats)), POLICIES[policy](seed), max_ticks)
+    return {"config": label, "policy": policy, "seed": seed, "wave": sim.wave,
+            "score": sim.score, "ticks": sim.ticks, "died": sim.game_over}
+
+
+def parse_sweep(settings, parser):
+    # ["health.orc=30,40", "trap=25"] -> [("health.orc", [30, 40]), ("trap", [25])]
+    axes = []
+    for setting in settings:
+        key, _, values = setting.partition("=")
+        if key not in DEFAULT_STATS:
+            parser.error(f"unknown stat {key!r}; choose from {', '.join(DEFAULT_STATS)}")
+        try:
+            axes.append((key, [int(value) for value in values.split(",")]))
+        except ValueError:
+            parser.error(f"--set {setting}: values must be comma-separated integers")
+    return axes
+
+
+def sweep_configs(axes):
+    # One config per combination of swept values: (label, full stats dict).
+    keys = [key for key, _ in axes]
+    for values in itertools.product(*(values for _, values in axes)):
+        overrides = dict(zip(keys, values))
+        label = " ".join(f"{key}={value}" for key, value in overrides.items()) or "default"
+        yield label, {**DEFAULT_STATS, **overrides}
+
+
+def distribution(values):
+    values = sorted(values)
+    if len(values) > 1:
+        deciles = statistics.quantiles(values, n=10, method="inclusive")
+    else:
+        deciles = values * 9
+    return {"mean": statistics.fmean(values), "min": values[0], "p10": deciles[0],
+            "median": deciles[4], "p90": deciles[8], "max": values[-1]}
+
+
+def summarize(results):
+    groups = {}
+    for result in results:
+        groups.setdefault((result["config"], result["policy"]), []).append(result)
+    summary = []
+    for (label, policy), games in groups.items():
+        waves = [game["wave"] for game in games]
+        summary.append({
+            "config": label,
+            "policy": policy,
+            "games": len(games),
+            "died": sum(game["died"] for game in games),
+            "wave": distribution(waves),
+            "score": distribution([game["score"] for game in games]),
+            "wave_histogram": dict(sorted(Counter(waves).items())),
+        })
+    return summary
+
+
+def run_games(tasks, workers):
+    if workers <= 1:
+        return [play_game(task) for task in tasks]
+    from concurrent.futures import ProcessPoolExecutor
+    # Big chunks keep the per-task pickling small next to a game's runtime.
+    chunksize = max(1, len(tasks) // (workers * 16))
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(play_game, tasks, chunksize=chunksize))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000, help="seeded games per config and policy")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--policy", nargs="+", choices=POLICIES, default=list(POLICIES))
+    parser.add_argument("--max-ticks", type=int, default=5000, help="stop a game that is still running after this")
+    parser.add_argument("--set", action="append", default=[], metavar="STAT=V1,V2",
+                        help=f"sweep a stat over values; repeatable. Stats: {', '.join(DEFAULT_STATS)}")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--csv", metavar="PATH", help="write one row per game")
+    parser.add_argument("--json", metavar="PATH", help="write the per-config, per-policy summary")
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+    args.axes = parse_sweep(args.set, parser)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # The same seeds for every config, so configs are compared on the same games.
+    seeds = range(args.first_seed, args.first_seed + args.games)
+    tasks = [(label, stats, policy, seed, args.max_ticks)
+             for label, stats in sweep_configs(args.axes) for policy in args.policy for seed in seeds]
+
+    start = time.perf_counter()
+    results = run_games(tasks, args.workers)
+    elapsed = time.perf_counter() - start
+    summary = summarize(results)
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(summary, file, indent=2)
+
+    width = max(len(row["config"]) for row in summary)
+    print(f"{'config':<{width}} {'policy':>7} {'games':>6} {'died':>6} "
+          f"{'wave mean':>9} {'p10':>4} {'p50':>4} {'p90':>4} {'score mean':>10}")
+    for row in summary:
+        wave = row["wave"]
+        print(f"{row['config']:<{width}} {row['policy']:>7} {row['games']:>6} {row['died'] / row['games']:>6.0%} "
+              f"{wave['mean']:>9.2f} {wave['p10']:>4.0f} {wave['median']:>4.0f} {wave['p90']:>4.0f} "
+              f"{row['score']['mean']:>10.1f}")
+    print(f"{len(tasks)} games in {elapsed:.1f}s ({len(tasks) / elapsed:,.0f} games/s, {args.workers} workers)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
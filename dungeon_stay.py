@@ -1,109 +1,409 @@
 #!/usr/bin/env python3
+import argparse
 import curses
+import io
+import pickle
 import random
+import struct
+import sys
 import time
-from collections import deque
+import zlib
+from collections import deque, namedtuple
+
+from game_loop import GameLoop, RandomKeys, run_headless
+from instrumentation import profiler, timed
+
+try:
+    import numpy as np
+except ImportError:  # only BatchSimulation needs it
+    np = None
+
+# Per-type stats, shared by every entity of the type. Rules bundles the
+# tables a Simulation plays by; replace() it to try other numbers.
+EnemyType = namedtuple("EnemyType", "name char color health strength")  # strength: (low, high), rolled per enemy
+WeaponType = namedtuple("WeaponType", "name char color damage")
+Rules = namedtuple("Rules", "enemies weapons trap_damage")
+
+DEFAULT_RULES = Rules(
+    enemies=(
+        EnemyType("goblin", 'g', 2, 20, (5, 15)),
+        EnemyType("orc", 'O', 3, 40, (5, 15)),
+        EnemyType("ghost", '&', 4, 15, (5, 15)),
+    ),
+    weapons=(
+        WeaponType("sword", '/', 5, 15),
+        WeaponType("bow", '}', 6, 10),
+        WeaponType("axe", '\\', 7, 20),
+    ),
+    trap_damage=25,
+)
 
 class GameObject:
-    def __init__(self, x, y, char, color):
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
         self.x = x
         self.y = y
-        self.char = char
-        self.color = color
-
-    def draw(self, stdscr):
-        stdscr.addch(self.y, self.x, self.char, curses.color_pair(self.color))
 
 class Player(GameObject):
+    __slots__ = ("health", "strength", "weapons", "weapon_damage", "traps")
+    char = '@'
+    color = 1
+
     def __init__(self, x, y):
-        super().__init__(x, y, '@', 1)
+        super().__init__(x, y)
         self.health = 100
         self.strength = 10
         self.weapons = ["fists"]
+        self.weapon_damage = 0  # bonus of the weapon in hand, fixed when it is picked up
         self.traps = 0
 
+    def equip(self, weapon_type):
+        self.weapons.append(weapon_type.name)
+        self.weapon_damage = weapon_type.damage
+
 class Enemy(GameObject):
-    def __init__(self, x, y, enemy_type="goblin"):
-        colors = {"goblin": 2, "orc": 3, "ghost": 4}
-        chars = {"goblin": 'g', "orc": 'O', "ghost": '&'}
-        health = {"goblin": 20, "orc": 40, "ghost": 15}
-        super().__init__(x, y, chars[enemy_type], colors[enemy_type])
-        self.health = health[enemy_type]
-        self.strength = random.randint(5, 15)
-        self.type = enemy_type
+    __slots__ = ("kind", "health", "strength")
+
+    def __init__(self, x, y, kind, strength):
+        super().__init__(x, y)
+        self.kind = kind
+        self.health = kind.health
+        self.strength = strength
+
+    @property
+    def type(self):
+        return self.kind.name
+
+    @property
+    def char(self):
+        return self.kind.char
+
+    @property
+    def color(self):
+        return self.kind.color
 
     def take_damage(self, damage):
         self.health -= damage
         return self.health <= 0
 
 class Weapon(GameObject):
-    def __init__(self, x, y, weapon_type="sword"):
-        colors = {"sword": 5, "bow": 6, "axe": 7}
-        chars = {"sword": '/', "bow": '}', "axe": '\\'}
-        super().__init__(x, y, chars[weapon_type], colors[weapon_type])
-        self.type = weapon_type
-        self.damage = {"sword": 15, "bow": 10, "axe": 20}[weapon_type]
+    __slots__ = ("kind",)
+
+    def __init__(self, x, y, kind):
+        super().__init__(x, y)
+        self.kind = kind
+
+    @property
+    def type(self):
+        return self.kind.name
+
+    @property
+    def char(self):
+        return self.kind.char
+
+    @property
+    def color(self):
+        return self.kind.color
 
 class Trap(GameObject):
-    def __init__(self, x, y):
-        super().__init__(x, y, '^', 8)
-        self.damage = 25
+    __slots__ = ("damage",)
+    char = '^'
+    color = 8
 
-class Game:
-    def __init__(self, stdscr):
-        self.stdscr = stdscr
+    def __init__(self, x, y, damage):
+        super().__init__(x, y)
+        self.damage = damage
+
+class SpatialGrid:
+    """Map from cell to the objects standing on it, kept current as they move.
+
+    Every lookup touches at most nine cells, however many objects there are.
+    """
+
+    def __init__(self):
+        self.cells = {}
+
+    def add(self, obj):
+        # Each cell is an insertion-ordered set, so crowded cells stay cheap to update.
+        self.cells.setdefault((obj.x, obj.y), {})[obj] = None
+
+    def remove(self, obj):
+        cell = self.cells[obj.x, obj.y]
+        del cell[obj]
+        if not cell:
+            del self.cells[obj.x, obj.y]
+
+    def move(self, obj, x, y):
+        # remove() and add() inlined; this runs for every enemy step.
+        cells = self.cells
+        cell = cells[obj.x, obj.y]
+        del cell[obj]
+        if not cell:
+            del cells[obj.x, obj.y]
+        obj.x, obj.y = x, y
+        cell = cells.get((x, y))
+        if cell is None:
+            cells[x, y] = {obj: None}
+        else:
+            cell[obj] = None
+
+    def at(self, x, y):
+        return self.cells.get((x, y), ())
+
+    def around(self, x, y):
+        # Objects on (x, y) and the eight cells touching it.
+        found = []
+        for cy in (y - 1, y, y + 1):
+            for cx in (x - 1, x, x + 1):
+                found.extend(self.cells.get((cx, cy), ()))
+        return found
+
+    def __contains__(self, position):
+        return position in self.cells
+
+class FlowField:
+    """The next step toward one target from every cell of the map, shared by all enemies.
+
+    A single breadth-first search from the target fills in every cell's
+    distance, and each enemy then reads its step in O(1). The search is only
+    redone when the target moves or invalidate() reports a change to the
+    walls. Steps are 8-way like the original greedy AI. Where the greedy
+    step is also a shortest one it is taken, so on an open map enemies move
+    exactly as they always did; with no walls at all the search is skipped.
+    """
+
+    NEIGHBOURS = [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+
+    def __init__(self, width, height, walls):
+        self.width = width
+        self.height = height
+        self.walls = walls
+        self.passable = None
+        self.target = None
+        self.distance = []
+        self.steps = []
+        self.arrays = None
+
+    def invalidate(self):
+        self.passable = None
+        self.target = None
+
+    def update(self, x, y):
+        if (x, y) == self.target:
+            return
+        self.target = (x, y)
+        self.steps = [None] * (self.width * self.height)
+        self.arrays = None
+        if not self.walls:
+            self.distance = None  # every greedy step is a shortest one
+            return
+
+        width = self.width
+        if self.passable is None:
+            passable = bytearray(width * self.height)
+            for row in range(1, self.height - 1):
+                passable[row * width + 1:row * width + width - 1] = b"\x01" * (width - 2)
+            for wall_x, wall_y in self.walls:
+                passable[wall_y * width + wall_x] = 0
+            self.passable = passable
+
+        # Walls and the border are never passable, so neighbours of a
+        # passable cell are always inside the map.
+        passable = self.passable
+        distance = [-1] * len(passable)
+        offsets = [dy * width + dx for dx, dy in self.NEIGHBOURS]
+        start = y * width + x
+        distance[start] = 0
+        # Iterating a list that grows as we go is a FIFO queue without the pops.
+        queue = [start]
+        for cell in queue:
+            next_distance = distance[cell] + 1
+            for offset in offsets:
+                neighbour = cell + offset
+                if distance[neighbour] < 0 and passable[neighbour]:
+                    distance[neighbour] = next_distance
+                    queue.append(neighbour)
+        self.distance = distance
+
+    def step(self, x, y):
+        cell = y * self.width + x
+        step = self.steps[cell]
+        if step is None:
+            step = self.steps[cell] = self.best_step(x, y)
+        return step
+
+    def best_step(self, x, y):
+        target_x, target_y = self.target
+        greedy_x = (target_x > x) - (target_x < x)
+        greedy_y = (target_y > y) - (target_y < y)
+        distance = self.distance
+        if distance is None:
+            return greedy_x, greedy_y
+        width = self.width
+        wanted = distance[y * width + x] - 1
+        if wanted < 0:
+            return 0, 0  # on the target, or cut off from it
+        if distance[(y + greedy_y) * width + x + greedy_x] == wanted:
+            return greedy_x, greedy_y
+        for dx, dy in self.NEIGHBOURS:
+            if distance[(y + dy) * width + x + dx] == wanted:
+                return dx, dy
+
+    def step_arrays(self):
+        # Every cell's step as two (height, width) arrays, chosen as step() does.
+        if self.arrays is None and self.distance is None:
+            target_x, target_y = self.target
+            rows, columns = np.indices((self.height, self.width))
+            self.arrays = np.sign(target_x - columns), np.sign(target_y - rows)
+        elif self.arrays is None:
+            height, width = self.height, self.width
+            distance = np.array(self.distance).reshape(height, width)
+            padded = np.full((height + 2, width + 2), -1)
+            padded[1:-1, 1:-1] = distance
+            wanted = distance - 1
+            step_x = np.zeros((height, width), np.int32)
+            step_y = np.zeros((height, width), np.int32)
+            found = wanted < 0
+            for dx, dy in self.NEIGHBOURS:
+                hit = ~found & (padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width] == wanted)
+                step_x[hit] = dx
+                step_y[hit] = dy
+                found |= hit
+
+            target_x, target_y = self.target
+            rows, columns = np.indices((height, width))
+            greedy_x = np.sign(target_x - columns)
+            greedy_y = np.sign(target_y - rows)
+            greedy = (wanted >= 0) & (padded[1 + rows + greedy_y, 1 + columns + greedy_x] == wanted)
+            step_x[greedy] = greedy_x[greedy]
+            step_y[greedy] = greedy_y[greedy]
+            self.arrays = step_x, step_y
+        return self.arrays
+
+def barrier_walls(width, height, spacing=6):
+    # Vertical walls every ``spacing`` columns with the gap alternating
+    # between top and bottom, so the way to the player winds around them.
+    walls = set()
+    for n, x in enumerate(range(spacing, width - 2, spacing)):
+        gap = range(1, 3) if n % 2 else range(height - 3, height - 1)
+        walls.update((x, y) for y in range(1, height - 1) if y not in gap)
+    return walls
+
+class EnemyArrays:
+    """Struct-of-arrays enemy store: one NumPy array per field, indexed by enemy.
+
+    Enemies stay in spawn order. ``arrival`` numbers the moments enemies
+    entered their current cell, which is the order SpatialGrid keeps them in.
+    """
+
+    FIELDS = ("x", "y", "health", "strength", "kind", "arrival")
+
+    def __init__(self, kinds):
+        self.kinds = kinds  # Rules.enemies
+        self.x = np.empty(0, np.int32)
+        self.y = np.empty(0, np.int32)
+        self.health = np.empty(0, np.int64)
+        self.strength = np.empty(0, np.int64)
+        self.kind = np.empty(0, np.int8)  # index into Rules.enemies
+        self.arrival = np.empty(0, np.int64)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __iter__(self):
+        # Enemy objects built on demand, for the renderer and policies.
+        kinds = self.kinds
+        for x, y, health, strength, kind in zip(self.x.tolist(), self.y.tolist(), self.health.tolist(),
+                                                self.strength.tolist(), self.kind.tolist()):
+            enemy = Enemy(x, y, kinds[kind], strength)
+            enemy.health = health
+            yield enemy
+
+    def extend(self, **columns):
+        for field in self.FIELDS:
+            array = getattr(self, field)
+            setattr(self, field, np.concatenate([array, np.asarray(columns[field], array.dtype)]))
+
+    def keep(self, mask):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field)[mask])
+
+class Simulation:
+    """The game rules with no terminal attached.
+
+    All randomness comes from ``self.rng``, seeded at construction, and input
+    arrives as curses key codes through ``step(key)``, so a run is fully
+    determined by the seed and the key sequence.
+    """
+
+    def __init__(self, seed=None, map_width=30, map_height=15, walls=(), rules=DEFAULT_RULES):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.rules = rules
         self.running = True
         self.game_over = False
         self.wave = 1
         self.score = 0
+        self.ticks = 0
         self.message_log = deque(maxlen=5)
-        
-        # Initialize colors
-        curses.start_color()
-        curses.init_pair(1, curses.COLOR_GREEN, curses.COLOR_BLACK)  # Player
-        curses.init_pair(2, curses.COLOR_RED, curses.COLOR_BLACK)    # Goblin
-        curses.init_pair(3, curses.COLOR_YELLOW, curses.COLOR_BLACK) # Orc
-        curses.init_pair(4, curses.COLOR_WHITE, curses.COLOR_BLACK)   # Ghost
-        curses.init_pair(5, curses.COLOR_BLUE, curses.COLOR_BLACK)    # Sword
-        curses.init_pair(6, curses.COLOR_CYAN, curses.COLOR_BLACK)    # Bow
-        curses.init_pair(7, curses.COLOR_MAGENTA, curses.COLOR_BLACK) # Axe
-        curses.init_pair(8, curses.COLOR_RED, curses.COLOR_BLACK)     # Trap
-        
+
         # Game setup
-        self.map_width = 30
-        self.map_height = 15
+        self.map_width = map_width
+        self.map_height = map_height
         self.player = Player(self.map_width // 2, self.map_height // 2)
-        self.enemies = []
-        self.weapons = []
-        self.traps = []
+        # Interior walls; callers that change them must call flow.invalidate()
+        self.walls = set(walls) - {(self.player.x, self.player.y)}
+        self.flow = FlowField(self.map_width, self.map_height, self.walls)
+        # Dicts used as insertion-ordered sets: O(1) removal, stable iteration order.
+        self.enemies = self.new_enemies()
+        self.weapons = {}
+        self.traps = {}
+        self.enemy_grid = SpatialGrid()
+        self.weapon_grid = SpatialGrid()
+        self.trap_grid = SpatialGrid()
         self.spawn_weapons(2)
         self.spawn_enemies(3)
 
+    def new_enemies(self):
+        return {}
+
+    @timed("spawn_enemies")
     def spawn_enemies(self, count):
-        enemy_types = ["goblin", "orc", "ghost"]
-        for _ in range(count):
-            x, y = self.random_position()
-            self.enemies.append(Enemy(x, y, random.choice(enemy_types)))
+        for x, y in self.spawn_positions(count):
+            kind = self.rng.choice(self.rules.enemies)
+            enemy = Enemy(x, y, kind, self.rng.randint(*kind.strength))
+            self.enemies[enemy] = None
+            self.enemy_grid.add(enemy)
 
     def spawn_weapons(self, count):
-        weapon_types = ["sword", "bow", "axe"]
-        for _ in range(count):
-            x, y = self.random_position()
-            self.weapons.append(Weapon(x, y, random.choice(weapon_types)))
-
-    def random_position(self):
-        while True:
-            x = random.randint(1, self.map_width - 2)
-            y = random.randint(1, self.map_height - 2)
-            if (x, y) != (self.player.x, self.player.y):
-                return x, y
+        for x, y in self.spawn_positions(count):
+            weapon = Weapon(x, y, self.rng.choice(self.rules.weapons))
+            self.weapons[weapon] = None
+            self.weapon_grid.add(weapon)
+
+    def enemy_cells(self):
+        return self.enemy_grid.cells.keys()
+
+    def spawn_positions(self, count):
+        # Distinct free cells while they last; after that, any cell but the
+        # player's. A map with no other cell gets fewer than count.
+        cells = [(x, y) for y in range(1, self.map_height - 1) for x in range(1, self.map_width - 1)
+                 if (x, y) not in self.walls]
+        occupied = {(self.player.x, self.player.y)}
+        occupied.update(self.enemy_cells(), self.weapon_grid.cells, self.trap_grid.cells)
+        free = [cell for cell in cells if cell not in occupied]
+        if count <= len(free):
+            return self.rng.sample(free, count)
+        cells.remove((self.player.x, self.player.y))
+        self.rng.shuffle(free)
+        return free + (self.rng.choices(cells, k=count - len(free)) if cells else [])
 
     def add_message(self, message):
         self.message_log.append(message)
 
-    def handle_input(self):
-        key = self.stdscr.getch()
-        
+    @timed("input")
+    def handle_input(self, key):
         if key == ord('q'):
             self.running = False
         elif key == ord('a'):  # Attack
@@ -122,60 +422,81 @@ class Game:
 
     def move_player(self, dx, dy):
         new_x, new_y = self.player.x + dx, self.player.y + dy
-        if 0 < new_x < self.map_width - 1 and 0 < new_y < self.map_height - 1:
+        if (0 < new_x < self.map_width - 1 and 0 < new_y < self.map_height - 1
+                and (new_x, new_y) not in self.walls):
             self.player.x, self.player.y = new_x, new_y
 
+    def kill_enemy(self, enemy):
+        del self.enemies[enemy]
+        self.enemy_grid.remove(enemy)
+        self.score += 10
+
+    def attack_damage(self):
+        return self.player.strength + self.player.weapon_damage
+
     def attack_enemies(self):
-        for enemy in self.enemies[:]:
-            if abs(self.player.x - enemy.x) <= 1 and abs(self.player.y - enemy.y) <= 1:
-                damage = self.player.strength
-                if self.player.weapons[-1] != "fists":
-                    damage += next(w.damage for w in self.weapons if w.type == self.player.weapons[-1])
-                
-                if enemy.take_damage(damage):
-                    self.enemies.remove(enemy)
-                    self.score += 10
-                    self.add_message(f"You killed the {enemy.type}!")
-                else:
-                    self.add_message(f"You hit the {enemy.type}! (HP: {enemy.health})")
+        damage = self.attack_damage()
+        for enemy in self.enemy_grid.around(self.player.x, self.player.y):
+            if enemy.take_damage(damage):
+                self.kill_enemy(enemy)
+                self.add_message(f"You killed the {enemy.type}!")
+            else:
+                self.add_message(f"You hit the {enemy.type}! (HP: {enemy.health})")
 
     def place_trap(self):
         if self.player.traps > 0:
-            self.traps.append(Trap(self.player.x, self.player.y))
+            trap = Trap(self.player.x, self.player.y, self.rules.trap_damage)
+            self.traps[trap] = None
+            self.trap_grid.add(trap)
             self.player.traps -= 1
             self.add_message("Trap placed!")
         else:
             self.add_message("No traps left!")
 
+    @timed("update")
     def update(self):
         if self.game_over:
             return
 
         # Check weapon pickup
-        for weapon in self.weapons[:]:
-            if (self.player.x, self.player.y) == (weapon.x, weapon.y):
-                self.player.weapons.append(weapon.type)
-                self.weapons.remove(weapon)
-                self.add_message(f"You picked up a {weapon.type}!")
-
-        # Check trap triggers
-        for trap in self.traps[:]:
-            for enemy in self.enemies[:]:
-                if (enemy.x, enemy.y) == (trap.x, trap.y):
-                    if enemy.take_damage(trap.damage):
-                        self.enemies.remove(enemy)
-                        self.score += 10
-                        self.add_message(f"Trap killed {enemy.type}!")
-                    self.traps.remove(trap)
-                    break
+        for weapon in list(self.weapon_grid.at(self.player.x, self.player.y)):
+            self.player.equip(weapon.kind)
+            del self.weapons[weapon]
+            self.weapon_grid.remove(weapon)
+            self.add_message(f"You picked up a {weapon.type}!")
+
+        self.trigger_traps()
+        self.move_enemies()
+
+        # Wave system
+        if len(self.enemies) == 0:
+            self.wave += 1
+            self.spawn_enemies(self.wave + 2)
+            self.spawn_weapons(1)
+            self.player.traps += 1
+            self.add_message(f"Wave {self.wave} incoming!")
+
+    def trigger_traps(self):
+        # Each trap hits one enemy standing on it, then is used up
+        for trap in list(self.traps):
+            victims = self.enemy_grid.at(trap.x, trap.y)
+            if victims:
+                enemy = next(iter(victims))
+                if enemy.take_damage(trap.damage):
+                    self.kill_enemy(enemy)
+                    self.add_message(f"Trap killed {enemy.type}!")
+                del self.traps[trap]
+                self.trap_grid.remove(trap)
 
-        # Enemy movement & attacks
+    @timed("move_enemies")
+    def move_enemies(self):
+        self.flow.update(self.player.x, self.player.y)
+        step = self.flow.step
         for enemy in self.enemies:
-            # Simple AI: move toward player
-            dx = 1 if enemy.x < self.player.x else -1 if enemy.x > self.player.x else 0
-            dy = 1 if enemy.y < self.player.y else -1 if enemy.y > self.player.y else 0
-            enemy.x += dx
-            enemy.y += dy
+            # Follow the flow field toward the player
+            dx, dy = step(enemy.x, enemy.y)
+            if dx or dy:
+                self.enemy_grid.move(enemy, enemy.x + dx, enemy.y + dy)
 
             # Enemy attack
             if abs(enemy.x - self.player.x) <= 1 and abs(enemy.y - self.player.y) <= 1:
@@ -185,70 +506,556 @@ class Game:
                     self.game_over = True
                     self.add_message("YOU DIED!")
 
-        # Wave system
-        if len(self.enemies) == 0:
-            self.wave += 1
-            self.spawn_enemies(self.wave + 2)
-            self.spawn_weapons(1)
-            self.player.traps += 1
-            self.add_message(f"Wave {self.wave} incoming!")
+    def step(self, key):
+        self.handle_input(key)
+        self.update()
+        self.ticks += 1
 
-    def render(self):
+class BatchSimulation(Simulation):
+    """Simulation that keeps enemies in EnemyArrays and updates them all at once.
+
+    Plays out exactly like Simulation for the same seed and input, including
+    the message log, but the per-tick cost of movement, attacks and traps no
+    longer grows with Python work per enemy. Needs NumPy.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if np is None:
+            raise ImportError("BatchSimulation needs NumPy")
+        self.arrivals = 0
+        super().__init__(*args, **kwargs)
+
+    def new_enemies(self):
+        return EnemyArrays(self.rules.enemies)
+
+    def arrivals_for(self, count):
+        stamps = self.arrivals + np.arange(count)
+        self.arrivals += count
+        return stamps
+
+    @timed("spawn_enemies")
+    def spawn_enemies(self, count):
+        positions = self.spawn_positions(count)
+        enemy_types = self.rules.enemies
+        kinds, strengths = [], []
+        for _ in positions:
+            # Same draws, in the same order, as Simulation.spawn_enemies()
+            kind = self.rng.choice(enemy_types)
+            kinds.append(enemy_types.index(kind))
+            strengths.append(self.rng.randint(*kind.strength))
+        self.enemies.extend(
+            x=[x for x, _ in positions], y=[y for _, y in positions],
+            health=[enemy_types[kind].health for kind in kinds],
+            strength=strengths, kind=kinds, arrival=self.arrivals_for(len(positions)))
+
+    def enemy_cells(self):
+        return set(zip(self.enemies.x.tolist(), self.enemies.y.tolist()))
+
+    def report(self, indices, message):
+        # Only the newest messages survive in message_log, so only those are built.
+        for i in indices[-self.message_log.maxlen:]:
+            self.add_message(message(i))
+
+    def attack_enemies(self):
+        enemies = self.enemies
+        dx = enemies.x - self.player.x
+        dy = enemies.y - self.player.y
+        near = np.flatnonzero((np.abs(dx) <= 1) & (np.abs(dy) <= 1))
+        if not len(near):
+            return
+        # Same order as SpatialGrid.around(): cell by cell, then by arrival.
+        near = near[np.lexsort((enemies.arrival[near], (dy[near] + 1) * 3 + dx[near] + 1))]
+        enemies.health[near] -= self.attack_damage()
+        health = enemies.health
+        names = [kind.name for kind in self.rules.enemies]
+        kinds = enemies.kind
+        self.score += 10 * int(np.count_nonzero(health[near] <= 0))
+        self.report(near.tolist(), lambda i: (
+            f"You killed the {names[kinds[i]]}!" if health[i] <= 0
+            else f"You hit the {names[kinds[i]]}! (HP: {health[i]})"))
+        enemies.keep(health > 0)
+
+    def trigger_traps(self):
+        enemies = self.enemies
+        if not self.traps or not len(enemies):
+            return
+        trap_cells = [trap.y * self.map_width + trap.x for trap in self.traps]
+        on_trap = np.flatnonzero(np.isin(enemies.y.astype(np.int64) * self.map_width + enemies.x, trap_cells))
+        victims = {}
+        for i in on_trap[np.argsort(enemies.arrival[on_trap])].tolist():
+            victims.setdefault((int(enemies.x[i]), int(enemies.y[i])), []).append(i)
+
+        killed = False
+        for trap in list(self.traps):
+            queue = victims.get((trap.x, trap.y))
+            if queue:
+                i = queue[0]
+                enemies.health[i] -= trap.damage
+                if enemies.health[i] <= 0:
+                    queue.pop(0)
+                    killed = True
+                    self.score += 10
+                    self.add_message(f"Trap killed {self.rules.enemies[enemies.kind[i]].name}!")
+                del self.traps[trap]
+                self.trap_grid.remove(trap)
+        if killed:
+            enemies.keep(enemies.health > 0)
+
+    @timed("move_enemies")
+    def move_enemies(self):
+        enemies = self.enemies
+        if not len(enemies):
+            return
+        # Every enemy follows the flow field toward the player
+        self.flow.update(self.player.x, self.player.y)
+        step_x, step_y = self.flow.step_arrays()
+        dx = step_x[enemies.y, enemies.x]
+        dy = step_y[enemies.y, enemies.x]
+        enemies.x += dx
+        enemies.y += dy
+        moved = np.flatnonzero(dx | dy)
+        enemies.arrival[moved] = self.arrivals_for(len(moved))
+
+        # Enemy attacks, applied in spawn order like the per-object loop
+        attackers = np.flatnonzero((np.abs(enemies.x - self.player.x) <= 1) & (np.abs(enemies.y - self.player.y) <= 1))
+        if not len(attackers):
+            return
+        health = self.player.health
+        dealt = np.cumsum(enemies.strength[attackers]).tolist()
+        tail = len(attackers) - self.message_log.maxlen
+        for n, i in enumerate(attackers.tolist()):
+            if n >= tail:
+                remaining = health - dealt[n]
+                self.add_message(f"{self.rules.enemies[enemies.kind[i]].name} hit you! (HP: {remaining})")
+                if remaining <= 0:
+                    self.add_message("YOU DIED!")
+        self.player.health = health - dealt[-1]
+        if self.player.health <= 0:
+            self.game_over = True
+
+class ScriptedInput:
+    """Input source that replays a fixed key sequence, then reports no key."""
+
+    def __init__(self, keys):
+        self.keys = iter(keys)
+
+    def __call__(self, sim):
+        return next(self.keys, -1)
+
+class RandomInput(RandomKeys):
+    """Input source that presses a random game key (or nothing) each tick."""
+
+    KEYS = [-1, curses.KEY_UP, curses.KEY_DOWN, curses.KEY_LEFT, curses.KEY_RIGHT, ord('a'), ord('t')]
+
+SESSION_MAGIC = b"DSTAYLOG\x01"
+# Keys a session log stores in one byte; anything else is escaped.
+SESSION_KEYS = [-1, curses.KEY_UP, curses.KEY_DOWN, curses.KEY_LEFT, curses.KEY_RIGHT,
+                ord('a'), ord('t'), ord('q'), ord('f'), curses.KEY_RESIZE]
+SESSION_KEY_CODES = {key: code for code, key in enumerate(SESSION_KEYS)}
+SESSION_RAW_KEY = 255
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+class SessionRecorder:
+    """Records a session as the key pressed on every tick plus periodic snapshots.
+
+    File layout: SESSION_MAGIC, the seed as an int64 (-1 if unknown), then
+    chunks of two kinds:
+
+    - ``K`` + uint32 size + key runs: a code byte (an index into
+      SESSION_KEYS, or SESSION_RAW_KEY followed by the key as an int32) and
+      a varint tick count. Idle stretches cost two bytes however long.
+    - ``S`` + uint64 tick + uint32 size + a zlib-compressed pickle of the
+      Simulation as it was before that tick.
+
+    A snapshot is written on the first tick, every ``snapshot_every`` ticks
+    and on close. Keys are flushed with each snapshot, so a crash loses at
+    most one interval.
+    """
+
+    def __init__(self, path, seed, snapshot_every=500):
+        self.file = open(path, "wb")
+        self.file.write(SESSION_MAGIC + struct.pack("<q", -1 if seed is None else seed))
+        self.snapshot_every = snapshot_every
+        self.pending = bytearray()
+        self.started = False
+        self.key = None
+        self.run = 0
+
+    def record(self, sim, key):
+        # Call with the key just before sim.step(key).
+        if not self.started or sim.ticks % self.snapshot_every == 0:
+            self.snapshot(sim)
+            self.started = True
+        if key == self.key:
+            self.run += 1
+        else:
+            self.end_run()
+            self.key, self.run = key, 1
+
+    def end_run(self):
+        if not self.run:
+            return
+        code = SESSION_KEY_CODES.get(self.key)
+        if code is None:
+            self.pending.append(SESSION_RAW_KEY)
+            self.pending += struct.pack("<i", self.key)
+        else:
+            self.pending.append(code)
+        write_varint(self.pending, self.run)
+        self.run = 0
+
+    @timed("snapshot")
+    def snapshot(self, sim):
+        self.end_run()
+        if self.pending:
+            self.file.write(b"K" + struct.pack("<I", len(self.pending)) + self.pending)
+            self.pending.clear()
+        state = zlib.compress(pickle.dumps(sim, pickle.HIGHEST_PROTOCOL))
+        self.file.write(b"S" + struct.pack("<QI", sim.ticks, len(state)) + state)
+        self.file.flush()
+
+    def close(self, sim):
+        # A final snapshot lets a replay confirm it ended in the same state.
+        self.snapshot(sim)
+        self.file.close()
+
+class SessionLog:
+    """A session written by SessionRecorder, read back for replay.
+
+    Snapshots are pickles, so only open logs you recorded yourself. A log cut
+    short by a crash is read up to its last complete chunk.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        if not data.startswith(SESSION_MAGIC):
+            raise ValueError("not a dungeon_stay session log")
+        pos = len(SESSION_MAGIC)
+        self.seed, = struct.unpack_from("<q", data, pos)
+        pos += 8
+        self.keys = []
+        self.snapshots = {}
+        self.first_tick = None
+
+        while pos < len(data):
+            kind = data[pos:pos + 1]
+            if kind == b"K" and pos + 5 <= len(data):
+                size, = struct.unpack_from("<I", data, pos + 1)
+                start, end = pos + 5, pos + 5 + size
+                if end > len(data):
+                    break
+                self.read_keys(data, start, end)
+            elif kind == b"S" and pos + 13 <= len(data):
+                tick, size = struct.unpack_from("<QI", data, pos + 1)
+                start, end = pos + 13, pos + 13 + size
+                if end > len(data):
+                    break
+                if self.first_tick is None:
+                    self.first_tick = tick
+                self.snapshots[tick] = data[start:end]
+            else:
+                break
+            pos = end
+        if self.first_tick is None:
+            raise ValueError("the log holds no snapshot")
+
+    def read_keys(self, data, pos, end):
+        keys = self.keys
+        while pos < end:
+            code = data[pos]
+            pos += 1
+            if code == SESSION_RAW_KEY:
+                key, = struct.unpack_from("<i", data, pos)
+                pos += 4
+            else:
+                key = SESSION_KEYS[code]
+            run, pos = read_varint(data, pos)
+            keys.extend([key] * run)
+
+    @property
+    def last_tick(self):
+        return self.first_tick + len(self.keys)
+
+    def key_at(self, tick):
+        return self.keys[tick - self.first_tick]
+
+    def simulation_at(self, tick):
+        # The latest snapshot at or before tick, still to be stepped up to it.
+        usable = [snapshot for snapshot in self.snapshots if snapshot <= tick]
+        state = zlib.decompress(self.snapshots[max(usable) if usable else self.first_tick])
+        return SnapshotUnpickler(io.BytesIO(state)).load()
+
+class SnapshotUnpickler(pickle.Unpickler):
+    # Logs recorded before the script ran through cli() name their classes
+    # __main__.Simulation and so on; look those up in this module instead.
+    def find_class(self, module, name):
+        return super().find_class(__name__ if module == "__main__" else module, name)
+
+def session_state(sim):
+    return (sim.ticks, sim.wave, sim.score, sim.player.health, sim.game_over,
+            list(sim.message_log), [(e.x, e.y, e.char) for e in sim.enemies])
+
+def replay_session(log, start=None, max_ticks=None):
+    """Replays a SessionLog headless from the tick ``start``.
+
+    Returns the simulation and each replayed tick's (seconds, tick) so the
+    slow ones can be found; the fast-forward from the nearest snapshot up to
+    ``start`` is not timed.
+    """
+    start = log.first_tick if start is None else min(max(start, log.first_tick), log.last_tick)
+    end = log.last_tick if max_ticks is None else min(log.last_tick, start + max_ticks)
+    sim = log.simulation_at(start)
+    while sim.ticks < start:
+        sim.step(log.key_at(sim.ticks))
+    clock = time.perf_counter
+    timings = []
+    while sim.ticks < end:
+        tick = sim.ticks
+        before = clock()
+        sim.step(log.key_at(tick))
+        timings.append((clock() - before, tick))
+    return sim, timings
+
+class Renderer:
+    """Draws a Simulation, rewriting only what changed since the previous frame.
+
+    The map is kept in a curses pad: floor and walls are drawn into it once,
+    then each frame restores the cells entities have left and draws the ones
+    they have entered. The part around the player that fits on screen is
+    copied out of the pad, so maps may be larger than the terminal, and
+    status and message lines are rewritten only when their text changes.
+    """
+
+    TEXT_ROWS = 8  # status, game over, five messages and frame stats under the map
+
+    def __init__(self, stdscr, sim):
+        self.stdscr = stdscr
+        self.sim = sim
+        # One spare column: writing a pad's bottom-right cell is an error.
+        self.pad = curses.newpad(sim.map_height, sim.map_width + 1)
+        for y in range(sim.map_height):
+            self.pad.addstr(y, 0, ''.join(self.floor_char(x, y) for x in range(sim.map_width)))
+        self.drawn = {}
+        self.invalidate()
+
+    def floor_char(self, x, y):
+        if x == 0 or y == 0 or x == self.sim.map_width - 1 or y == self.sim.map_height - 1:
+            return '#'
+        if (x, y) in self.sim.walls:
+            return '#'
+        return '.'
+
+    def invalidate(self):
+        # Full repaint on the next frame, e.g. after the terminal was resized.
+        self.screen_height, self.screen_width = self.stdscr.getmaxyx()
+        self.lines = {}
         self.stdscr.clear()
-        
-        # Draw borders
-        for y in range(self.map_height):
-            for x in range(self.map_width):
-                if x == 0 or y == 0 or x == self.map_width - 1 or y == self.map_height - 1:
-                    self.stdscr.addch(y, x, '#', curses.color_pair(0))
-                else:
-                    self.stdscr.addch(y, x, '.', curses.color_pair(0))
-        
-        # Draw weapons
-        for weapon in self.weapons:
-            weapon.draw(self.stdscr)
-        
-        # Draw traps
-        for trap in self.traps:
-            trap.draw(self.stdscr)
-        
-        # Draw enemies
-        for enemy in self.enemies:
-            enemy.draw(self.stdscr)
-        
-        # Draw player
-        self.player.draw(self.stdscr)
-        
+        self.pad.touchwin()
+
+    def write_line(self, row, text, attr):
+        if self.lines.get(row) == (text, attr) or row >= self.screen_height:
+            return
+        self.lines[row] = (text, attr)
+        self.stdscr.move(row, 0)
+        self.stdscr.clrtoeol()
+        self.stdscr.addnstr(row, 0, text, self.screen_width - 1, attr)
+
+    def render(self, overlay=None):
+        sim = self.sim
+
+        # Later groups cover earlier ones, as when each was drawn over the last
+        cells = {}
+        for group in (sim.weapons, sim.traps, sim.enemies, (sim.player,)):
+            for obj in group:
+                cells[obj.x, obj.y] = (obj.char, obj.color)
+        for x, y in self.drawn.keys() - cells.keys():
+            self.pad.addch(y, x, self.floor_char(x, y))
+        for (x, y), (char, color) in cells.items():
+            if self.drawn.get((x, y)) != (char, color):
+                self.pad.addch(y, x, char, curses.color_pair(color))
+        self.drawn = cells
+
+        view_height = max(0, min(sim.map_height, self.screen_height - self.TEXT_ROWS))
+        view_width = min(sim.map_width, self.screen_width)
+
         # UI
-        status = f"HP: {self.player.health} | Wave: {self.wave} | Score: {self.score} | Weapons: {self.player.weapons[-1]} | Traps: {self.player.traps}"
-        self.stdscr.addstr(self.map_height, 0, status, curses.color_pair(1))
-        
+        status = f"HP: {sim.player.health} | Wave: {sim.wave} | Score: {sim.score} | Weapons: {sim.player.weapons[-1]} | Traps: {sim.player.traps}"
+        self.write_line(view_height, status, curses.color_pair(1))
+        self.write_line(view_height + 1, "GAME OVER! Press 'q' to quit." if sim.game_over else "", curses.color_pair(2))
+
         # Messages
-        for i, message in enumerate(self.message_log):
-            self.stdscr.addstr(self.map_height + 2 + i, 0, message, curses.color_pair(4))
-        
-        if self.game_over:
-            self.stdscr.addstr(self.map_height + 1, 0, "GAME OVER! Press 'q' to quit.", curses.color_pair(2))
-        
-        self.stdscr.refresh()
-
-    def run(self):
-        while self.running:
-            self.handle_input()
-            self.update()
-            self.render()
-            time.sleep(0.1)
-
-def main(stdscr):
+        messages = list(sim.message_log)
+        for i in range(sim.message_log.maxlen):
+            self.write_line(view_height + 2 + i, messages[i] if i < len(messages) else "", curses.color_pair(4))
+        self.write_line(view_height + 2 + sim.message_log.maxlen, overlay or "", curses.color_pair(5))
+
+        self.stdscr.noutrefresh()
+        if view_height and view_width:
+            top = min(max(sim.player.y - view_height // 2, 0), sim.map_height - view_height)
+            left = min(max(sim.player.x - view_width // 2, 0), sim.map_width - view_width)
+            self.pad.noutrefresh(top, left, 0, 0, view_height - 1, view_width - 1)
+        curses.doupdate()
+
+class Game:
+    """Curses front-end: reads keys from the terminal and draws a Simulation."""
+
+    def __init__(self, stdscr, sim):
+        self.stdscr = stdscr
+        self.sim = sim
+
+        # Initialize colors
+        curses.start_color()
+        curses.init_pair(1, curses.COLOR_GREEN, curses.COLOR_BLACK)  # Player
+        curses.init_pair(2, curses.COLOR_RED, curses.COLOR_BLACK)    # Goblin
+        curses.init_pair(3, curses.COLOR_YELLOW, curses.COLOR_BLACK) # Orc
+        curses.init_pair(4, curses.COLOR_WHITE, curses.COLOR_BLACK)   # Ghost
+        curses.init_pair(5, curses.COLOR_BLUE, curses.COLOR_BLACK)    # Sword
+        curses.init_pair(6, curses.COLOR_CYAN, curses.COLOR_BLACK)    # Bow
+        curses.init_pair(7, curses.COLOR_MAGENTA, curses.COLOR_BLACK) # Axe
+        curses.init_pair(8, curses.COLOR_RED, curses.COLOR_BLACK)     # Trap
+        self.renderer = Renderer(stdscr, sim)
+        self.loop = None
+        self.show_stats = False
+        self.recorder = None
+
+    def add_message(self, message):
+        self.sim.add_message(message)
+
+    @timed("render")
+    def render(self):
+        self.renderer.render(self.loop.stats.overlay() if self.show_stats else None)
+
+    @timed("tick")
+    def tick(self):
+        # One key per tick, as the simulation expects; getch() does not block.
+        key = self.stdscr.getch()
+        if key == curses.KEY_RESIZE:
+            self.renderer.invalidate()
+        elif key == ord('f'):
+            self.show_stats = not self.show_stats
+        if self.recorder is not None:
+            self.recorder.record(self.sim, key)
+        self.sim.step(key)
+        return self.sim.running
+
+    def run(self, tick_seconds=0.1, stats_file=None):
+        self.loop = GameLoop(self.tick, self.render, tick_seconds)
+        try:
+            self.loop.run()
+        finally:
+            if stats_file:
+                self.loop.stats.dump(stats_file)
+            if self.recorder is not None:
+                self.recorder.close(self.sim)
+
+def main(stdscr, sim, tick_seconds=0.1, stats_file=None, recorder=None):
     curses.curs_set(0)
     stdscr.keypad(True)
-    stdscr.timeout(100)
-    
-    game = Game(stdscr)
+    stdscr.nodelay(True)
+
+    game = Game(stdscr, sim)
+    game.recorder = recorder
     game.add_message("Welcome to DUNGEON STAY!")
-    game.add_message("Arrow keys: Move | 'a': Attack | 't': Place Trap")
+    game.add_message("Arrow keys: Move | 'a': Attack | 't': Place Trap | 'f': Frame stats")
     game.add_message("Survive as long as you can!")
-    game.run()
+    game.run(tick_seconds, stats_file)
+
+def new_simulation(args):
+    walls = barrier_walls(args.width, args.height) if args.walls else ()
+    return (BatchSimulation if args.numpy else Simulation)(args.seed, args.width, args.height, walls)
+
+def new_recorder(args):
+    return SessionRecorder(args.record, args.seed, args.snapshot_every) if args.record else None
+
+def headless_main(args):
+    sim = new_simulation(args)
+    recorder = new_recorder(args)
+    start = time.perf_counter()
+    run_headless(sim, RandomInput(args.seed), args.ticks or 10000, recorder)
+    elapsed = time.perf_counter() - start
+    if recorder is not None:
+        recorder.close(sim)
+    print(f"seed={args.seed} ticks={sim.ticks} wave={sim.wave} score={sim.score} "
+          f"hp={sim.player.health} game_over={sim.game_over} ({sim.ticks / elapsed:,.0f} ticks/s)")
+
+def replay_main(args):
+    try:
+        log = SessionLog(args.replay)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Cannot replay {args.replay}: {e}")
+    if args.seek is not None and args.seek > log.last_tick:
+        sys.exit(f"Cannot seek to tick {args.seek}: {args.replay} ends at tick {log.last_tick}")
+    start = time.perf_counter()
+    sim, timings = replay_session(log, args.seek, args.ticks)
+    elapsed = time.perf_counter() - start
+    print(f"replayed ticks {timings[0][1] if timings else sim.ticks}-{sim.ticks} of {log.first_tick}-{log.last_tick} "
+          f"(seed {log.seed}) in {elapsed:.3f}s ({len(timings) / elapsed:,.0f} ticks/s)")
+    print(f"wave={sim.wave} score={sim.score} hp={sim.player.health} game_over={sim.game_over}")
+    if sim.ticks in log.snapshots:
+        recorded = session_state(log.simulation_at(sim.ticks))
+        print("state matches the recording" if session_state(sim) == recorded
+              else "DESYNC: state differs from the recording's snapshot")
+    for seconds, tick in sorted(timings, reverse=True)[:5]:
+        print(f"  tick {tick}: {seconds * 1e3:.3f} ms")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DUNGEON STAY")
+    parser.add_argument("--seed", type=int, help="seed the game's random number generator")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the simulation without a terminal, driven by random keys")
+    parser.add_argument("--ticks", type=int, help="tick limit for --headless (default 10000) or --replay")
+    parser.add_argument("--width", type=int, default=30, help="map width, walls included")
+    parser.add_argument("--height", type=int, default=15, help="map height, walls included")
+    parser.add_argument("--walls", action="store_true", help="add rows of walls for enemies to path around")
+    parser.add_argument("--tick-ms", type=float, default=100, help="simulation tick length in milliseconds")
+    parser.add_argument("--frame-stats", metavar="PATH", help="write tick/render timings to PATH as JSON on exit")
+    parser.add_argument("--record", metavar="PATH", help="record the session's keys and snapshots to PATH")
+    parser.add_argument("--snapshot-every", type=int, default=500, metavar="TICKS",
+                        help="ticks between snapshots in a recording")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recorded session headless and time each tick")
+    parser.add_argument("--seek", type=int, metavar="TICK", help="start the replay at TICK")
+    parser.add_argument("--numpy", action="store_true",
+                        help="keep enemies in NumPy arrays and update them in batches (for huge waves)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="time each game phase and write a summary to PATH on exit (.pstats: a cProfile dump)")
+    args = parser.parse_args(argv)
+    if args.numpy and np is None:
+        parser.error("--numpy needs NumPy installed")
+    if args.width < 4 or args.height < 4:
+        parser.error("the map must be at least 4x4")  # room for something besides the player
+    if args.record and args.seed is None:
+        args.seed = random.randrange(2**31)  # so the log names a seed that replays the start
+    return args
+
+def cli(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        profiler.enable(args.profile)
+    if args.replay:
+        replay_main(args)
+    elif args.headless:
+        headless_main(args)
+    else:
+        curses.wrapper(main, new_simulation(args), args.tick_ms / 1000, args.frame_stats, new_recorder(args))
 
 if __name__ == "__main__":
-    curses.wrapper(main)
\ No newline at end of file
+    # Run the imported module, not this __main__ copy, so recorded snapshots
+    # pickle dungeon_stay.Simulation and load wherever the module is imported.
+    from dungeon_stay import cli
+    cli()
@@ -0,0 +1,121 @@
+"""Fixed-timestep loop, frame-time counters and headless driving shared by the curses games."""
+import json
+import random
+import time
+from collections import deque
+
+
+class FrameStats:
+    """Tick and render timings over the last ``window`` samples, plus totals."""
+
+    def __init__(self, window=300):
+        self.tick_times = deque(maxlen=window)
+        self.render_times = deque(maxlen=window)
+        self.ticks = 0
+        self.frames = 0
+        self.dropped_frames = 0
+
+    def record_tick(self, seconds):
+        self.tick_times.append(seconds)
+        self.ticks += 1
+
+    def record_render(self, seconds):
+        self.render_times.append(seconds)
+        self.frames += 1
+
+    @staticmethod
+    def milliseconds(samples):
+        if not samples:
+            return {"mean": 0.0, "max": 0.0}
+        return {"mean": sum(samples) / len(samples) * 1e3, "max": max(samples) * 1e3}
+
+    def summary(self):
+        return {
+            "ticks": self.ticks,
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "tick_ms": self.milliseconds(self.tick_times),
+            "render_ms": self.milliseconds(self.render_times),
+        }
+
+    def overlay(self):
+        tick = self.milliseconds(self.tick_times)
+        render = self.milliseconds(self.render_times)
+        return (f"tick {tick['mean']:.2f}/{tick['max']:.2f}ms | render {render['mean']:.2f}/{render['max']:.2f}ms"
+                f" | dropped {self.dropped_frames}")
+
+    def dump(self, path):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+class RandomKeys:
+    """Input source that presses one of ``KEYS`` at random each tick; -1 is no key."""
+
+    KEYS = [-1]
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def __call__(self, game):
+        return self.rng.choice(self.KEYS)
+
+
+def run_headless(game, input_source, max_ticks, recorder=None):
+    # Steps a game with no terminal as fast as possible; stops at max_ticks,
+    # on 'q' or when the game is over.
+    while game.running and not game.game_over and game.ticks < max_ticks:
+        key = input_source(game)
+        if recorder is not None:
+            recorder.record(game, key)
+        game.step(key)
+    return game
+
+
+class GameLoop:
+    """Calls ``tick`` every ``tick_seconds`` and ``render`` after each batch of ticks.
+
+    Ticks are scheduled against the clock rather than by sleeping a fixed
+    time after each one, so the time spent ticking and rendering does not
+    slow the game down. When the loop falls behind it runs the missed ticks
+    back to back and renders once; each render skipped that way counts as a
+    dropped frame. After ``max_catch_up`` ticks in a row it gives up on the
+    backlog instead of spiralling. ``tick`` returns False to stop the loop.
+    """
+
+    def __init__(self, tick, render, tick_seconds=0.1, max_catch_up=5, stats=None):
+        self.tick = tick
+        self.render = render
+        self.tick_seconds = tick_seconds
+        self.max_catch_up = max_catch_up
+        self.stats = stats if stats is not None else FrameStats()
+        self.running = False
+
+    def run(self):
+        clock = time.perf_counter
+        stats = self.stats
+        self.running = True
+        next_tick = clock()
+        while self.running:
+            ticks = 0
+            while self.running and clock() >= next_tick and ticks < self.max_catch_up:
+                start = clock()
+                if self.tick() is False:
+                    self.running = False
+                stats.record_tick(clock() - start)
+                next_tick += self.tick_seconds
+                ticks += 1
+            behind = clock() - next_tick
+            if self.running and behind >= self.tick_seconds:
+                stats.dropped_frames += int(behind / self.tick_seconds)
+                next_tick += int(behind / self.tick_seconds) * self.tick_seconds
+
+            if ticks:
+                stats.dropped_frames += ticks - 1
+                start = clock()
+                self.render()
+                stats.record_render(clock() - start)
+
+            delay = next_tick - clock()
+            if self.running and delay > 0:
+                time.sleep(delay)
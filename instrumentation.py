@@ -0,0 +1,146 @@
+"""Opt-in phase timings and counters shared by the Python tools.
+
+Nothing is recorded unless profiling is switched on, either with a tool's
+``--profile PATH`` flag or by setting ``TOOLS_PROFILE=PATH`` in the
+environment. Functions marked with ``@timed("phase")`` then have every call
+timed into a histogram, ``count()`` adds to named counters, and on exit a
+summary is printed to stderr and written to PATH: as JSON, or, when PATH
+ends in .pstats or .prof, as a cProfile dump of the whole run for
+``python -m pstats PATH``.
+
+While profiling is off a timed function costs one extra call and a flag
+check, so only whole phases (a tick, a render, a load) are marked, never
+per-item inner loops.
+"""
+import os
+import sys
+import time
+from functools import wraps
+
+ENV_VAR = "TOOLS_PROFILE"
+PSTATS_SUFFIXES = (".pstats", ".prof")
+
+
+class Histogram:
+    """Call durations in power-of-two microsecond buckets, plus count, total and extremes."""
+
+    def __init__(self):
+        self.buckets = [0] * 40  # bucket n holds durations in [2**(n-1), 2**n) us; bucket 0 is < 1 us
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.buckets[min(int(seconds * 1e6).bit_length(), 39)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        # Upper edge of the bucket holding that fraction of calls, in microseconds
+        wanted = fraction * self.count
+        seen = 0
+        for n, calls in enumerate(self.buckets):
+            seen += calls
+            if seen >= wanted:
+                return min(float(2 ** n), self.max * 1e6)
+        return self.max * 1e6
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1e3,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "min_us": self.min * 1e6 if self.count else 0.0,
+            "max_us": self.max * 1e6,
+            "p50_us": self.percentile(0.5),
+            "p90_us": self.percentile(0.9),
+            "p99_us": self.percentile(0.99),
+            "histogram_us": {f"<{2 ** n}": calls for n, calls in enumerate(self.buckets) if calls},
+        }
+
+
+class Profiler:
+    """Phase histograms and counters for this process; ``profiler`` below is the one the tools share."""
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.phases = {}
+        self.counts = {}
+        self.cprofile = None
+
+    def enable(self, path):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.path = path
+        import atexit
+        atexit.register(self.dump)
+        if path.endswith(PSTATS_SUFFIXES):
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def record(self, phase, seconds):
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = Histogram()
+        histogram.record(seconds)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def timed(self, phase):
+        """Decorator timing every call of the function as ``phase`` while profiling is on."""
+        clock = time.perf_counter
+
+        def decorate(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = clock()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(phase, clock() - start)
+            return wrapper
+        return decorate
+
+    def summary(self):
+        return {
+            "phases": {phase: histogram.summary() for phase, histogram in sorted(self.phases.items())},
+            "counts": dict(sorted(self.counts.items())),
+        }
+
+    def report(self):
+        lines = [f"{'phase':<20} {'calls':>9} {'total ms':>10} {'mean us':>9} {'p50 us':>8} {'p99 us':>8} {'max us':>9}"]
+        for phase, stats in self.summary()["phases"].items():
+            lines.append(f"{phase:<20} {stats['count']:>9,} {stats['total_ms']:>10.1f} {stats['mean_us']:>9.1f} "
+                         f"{stats['p50_us']:>8.0f} {stats['p99_us']:>8.0f} {stats['max_us']:>9.0f}")
+        lines += [f"{name:<20} {value:>9,}" for name, value in sorted(self.counts.items())]
+        return "\n".join(lines)
+
+    def dump(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.path)
+        else:
+            import json
+            with open(self.path, "w") as file:
+                json.dump(self.summary(), file, indent=2)
+        print(f"{self.report()}\nprofile written to {self.path}", file=sys.stderr)
+
+
+profiler = Profiler()
+timed = profiler.timed
+count = profiler.count
+
+if os.environ.get(ENV_VAR):
+    profiler.enable(os.environ[ENV_VAR])
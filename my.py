@@ -1,12 +1,98 @@
-print("Hello")
-print("2 + 3 =", 2 + 3)
-print("10 - 4 =", 10 - 4)
-print("5 * 6 =", 5 * 6)
-print("20 / 4 =", 20 / 4)
+import argparse
+import ast
+import math
+import sys
+from functools import lru_cache
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # only needed for --numpy
+    np = None
 
 # A simple Python program demonstrating classes, methods, loops, and user input
 
+# Functions an expression may call, with the number of arguments each takes
+FUNCTIONS = {
+    "abs": (abs, 1),
+    "sqrt": (math.sqrt, 1),
+    "exp": (math.exp, 1),
+    "log": (math.log, 1),
+    "sin": (math.sin, 1),
+    "cos": (math.cos, 1),
+    "min": (min, 2),
+    "max": (max, 2),
+}
+EXPRESSION_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Call, ast.Load,
+                    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub)
+
+class Expression:
+    """An arithmetic expression, checked and compiled once, then evaluated for any values of its variables.
+
+    Only numbers, variables, + - * / // % ** and calls to FUNCTIONS are
+    allowed; anything else raises ValueError. Numbers are floats, as
+    everywhere in the calculator, so 9 ** 9 ** 9 overflows at once instead
+    of building a huge int.
+    """
+
+    def __init__(self, text):
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+        except SyntaxError:
+            raise ValueError(f"not an expression: {text!r}") from None
+        except (RecursionError, MemoryError):
+            raise ValueError("the expression is nested too deeply") from None
+        functions = set()
+        names = set()
+        for node in ast.walk(tree):  # parents before children
+            if not isinstance(node, EXPRESSION_NODES):
+                raise ValueError(f"{type(node).__name__} is not allowed in an expression")
+            if isinstance(node, ast.Call):
+                name = getattr(node.func, "id", None)
+                if name not in FUNCTIONS or node.keywords or len(node.args) != FUNCTIONS[name][1]:
+                    raise ValueError(f"unknown function or wrong arguments: {ast.unparse(node)}")
+                functions.add(node.func)
+            elif isinstance(node, ast.Name) and node not in functions:
+                if node.id in FUNCTIONS:
+                    raise ValueError(f"{node.id} is a function")
+                names.add(node.id)
+            elif isinstance(node, ast.Constant):
+                if type(node.value) not in (int, float):
+                    raise ValueError(f"{node.value!r} is not a number")
+                try:
+                    node.value = float(node.value)
+                except OverflowError:
+                    raise ValueError(f"{node.value} is too large") from None
+
+        self.text = text
+        self.variables = tuple(sorted(names))
+        # lambda <variables>: <expression>, with nothing but FUNCTIONS in scope
+        arguments = ast.arguments(posonlyargs=[], args=[ast.arg(name) for name in self.variables],
+                                  kwonlyargs=[], kw_defaults=[], defaults=[])
+        scope = {"__builtins__": {}, **{name: func for name, (func, _) in FUNCTIONS.items()}}
+        try:
+            function = ast.fix_missing_locations(ast.Expression(ast.Lambda(arguments, tree.body)))
+            self.function = eval(compile(function, "<expression>", "eval"), scope)
+        except (RecursionError, MemoryError):
+            raise ValueError("the expression is nested too deeply") from None
+
+    def values(self, variables):
+        # A mapping of variable values -> the arguments self.function takes
+        missing = [name for name in self.variables if name not in variables]
+        if missing:
+            raise TypeError(f"{self.text!r} needs a value for {', '.join(missing)}")
+        return [variables[name] for name in self.variables]
+
+    def __call__(self, /, **variables):
+        return self.function(*self.values(variables))
+
 class Calculator:
+    OPERATIONS = ("add", "subtract", "multiply", "divide")
+
+    def __init__(self, cache_size=256):
+        # Compiled expressions, keyed by their text
+        self.compile = lru_cache(maxsize=cache_size)(Expression)
+
     def add(self, a, b):
         return a + b
 
@@ -21,41 +107,238 @@ class Calculator:
             return "Cannot divide by zero"
         return a / b
 
-calc = Calculator()
+    def calculate(self, op, a, b):
+        if op not in self.OPERATIONS:
+            return "Unknown operation"
+        return getattr(self, op)(a, b)
+
+    def evaluate(self, expression, /, **variables):
+        # ValueError if the text is not an allowed expression
+        expression = self.compile(expression)
+        return self.apply(expression, expression.values(variables))
+
+    def apply(self, expression, values):
+        # values in expression.variables order; errors become messages like divide()'s
+        try:
+            result = expression.function(*values)
+        except ZeroDivisionError:
+            return "Cannot divide by zero"
+        except (OverflowError, ValueError):
+            return "Math error"
+        if isinstance(result, complex):  # a negative number to a fractional power
+            return "Math error"
+        return result
+
+    def calculate_columns(self, ops, a, b):
+        # The same results as calculate() for whole NumPy columns at once:
+        # ops is an array of operation names, a and b float arrays.
+        with np.errstate(all="ignore"):
+            results = np.select(
+                [ops == "add", ops == "subtract", ops == "multiply", ops == "divide"],
+                [a + b, a - b, a * b, a / np.where(b == 0, 1, b)],
+            ).tolist()
+        for i in np.flatnonzero((ops == "divide") & (b == 0)).tolist():
+            results[i] = "Cannot divide by zero"
+        for i in np.flatnonzero(~np.isin(ops, self.OPERATIONS)).tolist():
+            results[i] = "Unknown operation"
+        return results
+
+def parse_line(line):
+    # "op,a,b" -> (op, a, b); raises ValueError for anything else
+    op, a, b = line.split(",")
+    return op.strip().lower(), float(a), float(b)
 
-print("Welcome to the Python Calculator!")
-results = []  # List to store results
+def stream(calc, lines, out, first_line=1):
+    """Evaluates ``op,a,b`` lines one at a time, writing each line back with ``,result`` appended.
 
-while True:
-    print("\nChoose operation: add, subtract, multiply, divide, or exit")
-    op = input("Operation: ").strip().lower()
+    Blank lines are skipped and malformed ones reported on stderr. Returns
+    the counts of lines evaluated and rejected.
+    """
+    done = errors = 0
+    for number, line in enumerate(lines, first_line):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            op, a, b = parse_line(line)
+        except ValueError:
+            print(f"line {number}: expected op,a,b: {line!r}", file=sys.stderr)
+            errors += 1
+            continue
+        out.write(f"{line},{calc.calculate(op, a, b)}\n")
+        done += 1
+    return done, errors
 
-    if op == "exit":
-        break
+OP_WIDTH = 32  # longest operation name stream_columns() parses itself
+COLUMNS = np and np.dtype([("op", f"U{OP_WIDTH}"), ("a", float), ("b", float)])
 
+def stream_columns(calc, lines, out, chunk_size=16384):
+    """Like stream(), but parses and evaluates ``chunk_size`` lines at a time with NumPy.
+
+    A chunk NumPy cannot parse (a malformed line, or an operation name of
+    OP_WIDTH characters or more) goes through stream() instead, so the
+    output is the same either way.
+    """
+    done = errors = 0
+    first_line = 1
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return done, errors
+        if not any(map(str.strip, chunk)):
+            first_line += len(chunk)  # loadtxt would warn that the chunk holds no data
+            continue
+        try:
+            rows = np.loadtxt(chunk, dtype=COLUMNS, delimiter=",", comments=None, quotechar=None, ndmin=1)
+        except ValueError:
+            rows = None
+        else:
+            ops = rows["op"]
+            odd = ops[~np.isin(ops, calc.OPERATIONS)]
+            if len(odd):
+                if np.char.str_len(odd).max() == OP_WIDTH:
+                    rows = None  # possibly cut short by loadtxt
+                else:
+                    ops = np.char.lower(np.char.strip(ops))
+        if rows is None:
+            chunk_done, chunk_errors = stream(calc, chunk, out, first_line)
+            done, errors = done + chunk_done, errors + chunk_errors
+        else:
+            results = calc.calculate_columns(ops, rows["a"], rows["b"])
+            # loadtxt skipped the blank lines; str.format() writes floats as the f-string in stream() does
+            echoed = filter(None, map(str.strip, chunk))
+            out.write("".join(map("{},{}\n".format, echoed, results)))
+            done += len(results)
+        first_line += len(chunk)
+
+def stream_formula(calc, formula, lines, out):
+    """Evaluates ``formula`` once per line of comma-separated values.
+
+    The first non-blank line names the columns, and the formula's variables
+    are read from the columns of the same name. Every line is written back
+    with ``,result`` appended. The formula is compiled once, so each line
+    costs one call of the compiled function.
+    """
+    expression = calc.compile(formula)
+    done = errors = 0
+    columns = None
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if columns is None:
+            columns = [column.strip() for column in line.split(",")]
+            missing = [name for name in expression.variables if name not in columns]
+            if missing:
+                raise ValueError(f"no column for {', '.join(missing)} in {line!r}")
+            picks = [columns.index(name) for name in expression.variables]
+            out.write(f"{line},result\n")
+            continue
+        fields = line.split(",")
+        try:
+            if len(fields) != len(columns):
+                raise ValueError
+            values = [float(fields[i]) for i in picks]
+        except ValueError:
+            print(f"line {number}: expected {len(columns)} numbers: {line!r}", file=sys.stderr)
+            errors += 1
+            continue
+        out.write(f"{line},{calc.apply(expression, values)}\n")
+        done += 1
+    return done, errors
+
+def interactive(calc):
+    print("Hello")
+    print("2 + 3 =", 2 + 3)
+    print("10 - 4 =", 10 - 4)
+    print("5 * 6 =", 5 * 6)
+    print("20 / 4 =", 20 / 4)
+
+    print("Welcome to the Python Calculator!")
+    results = []  # List to store results
+
+    while True:
+        print("\nChoose operation: add, subtract, multiply, divide, or exit")
+        print("or type an expression such as (2 + 3) * sqrt(x)")
+        op = input("Operation: ").strip().lower()
+
+        if op == "exit":
+            break
+
+        if op not in calc.OPERATIONS:
+            try:
+                expression = calc.compile(op)
+                values = [float(input(f"Enter {name}: ")) for name in expression.variables]
+            except ValueError as e:
+                print(f"Invalid input: {e}")
+                continue
+            result = calc.apply(expression, values)
+            results.append(f"Expression: {op}, Numbers: {', '.join(map(str, values))}, Result: {result}")
+            print("Result:", result)
+            continue
+
+        try:
+            a = float(input("Enter first number: "))
+            b = float(input("Enter second number: "))
+        except ValueError:
+            print("Invalid input. Please enter numbers.")
+            continue
+
+        result = calc.calculate(op, a, b)
+        results.append(f"Operation: {op}, Numbers: {a}, {b}, Result: {result}")
+        print("Result:", result)
+
+    print("\nAll Results:")
+    for r in results:
+        print(r)
+
+    print("Goodbye!")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="A small calculator, interactive or over a file of op,a,b lines")
+    parser.add_argument("--batch", metavar="PATH", help="evaluate op,a,b lines from PATH ('-' for stdin)")
+    parser.add_argument("--formula", metavar="EXPR",
+                        help="with --batch, evaluate EXPR for each row of a CSV whose header names its variables")
+    parser.add_argument("--output", metavar="PATH", help="write op,a,b,result lines to PATH instead of stdout")
+    parser.add_argument("--numpy", action="store_true", help="evaluate --batch input in NumPy chunks")
+    parser.add_argument("--chunk-size", type=int, default=16384, help="lines per NumPy chunk")
+    args = parser.parse_args(argv)
+    calc = Calculator()
+
+    if args.formula and not args.batch:
+        parser.error("--formula needs --batch")
+    if not args.batch:
+        interactive(calc)
+        return
+    if args.numpy and np is None:
+        parser.error("--numpy needs NumPy installed")
+    if args.numpy and args.formula:
+        parser.error("--numpy only evaluates op,a,b lines")
+    if args.formula:
+        try:
+            calc.compile(args.formula)
+        except ValueError as e:
+            parser.error(f"--formula: {e}")
+    source = sys.stdin if args.batch == "-" else open(args.batch)
+    out = open(args.output, "w") if args.output else sys.stdout
     try:
-        a = float(input("Enter first number: "))
-        b = float(input("Enter second number: "))
-    except ValueError:
-        print("Invalid input. Please enter numbers.")
-        continue
-
-    if op == "add":
-        result = calc.add(a, b)
-    elif op == "subtract":
-        result = calc.subtract(a, b)
-    elif op == "multiply":
-        result = calc.multiply(a, b)
-    elif op == "divide":
-        result = calc.divide(a, b)
-    else:
-        result = "Unknown operation"
-
-    results.append(f"Operation: {op}, Numbers: {a}, {b}, Result: {result}")
-    print("Result:", result)
-
-print("\nAll Results:")
-for r in results:
-    print(r)
-
-print("Goodbye!")
+        if args.formula:
+            done, errors = stream_formula(calc, args.formula, source, out)
+        elif args.numpy:
+            done, errors = stream_columns(calc, source, out, args.chunk_size)
+        else:
+            done, errors = stream(calc, source, out)
+    except ValueError as e:  # the --formula header lacks one of its variables
+        sys.exit(f"{args.batch}: {e}")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    if errors:
+        print(f"{done} lines evaluated, {errors} rejected", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from data_entry_system import DataEntrySystem, JSONFileStorage, JournalStorage, SQLiteStorage
+
+
+def entry(number):
+    return {"name": f"User {number}", "age": 30, "email": f"user{number}@example.com",
+            "address": "N/A", "timestamp": "2024-01-01 12:00:00"}
+
+
+def import_rows(numbers):
+    return ((line_no, {"name": f"User {n}", "age": "30", "email": f"user{n}@example.com"})
+            for line_no, n in enumerate(numbers, 2))
+
+
+class StoreTestCase(unittest.TestCase):
+    storage = JournalStorage
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.directory.name, "user_data.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open_system(self):
+        return DataEntrySystem(self.data_file, self.storage(self.data_file))
+
+
+class JournalStorageTest(StoreTestCase):
+    def test_append_after_torn_record_keeps_acknowledged_entries(self):
+        writer = self.open_system()
+        self.assertTrue(writer.append_entry(entry(0)))
+
+        # Another writer crashes halfway through its record.
+        with open(self.data_file + ".journal", "ab") as journal:
+            journal.write(b'{"name": "Crashed", "ag')
+
+        for number in (1, 2, 3):
+            self.assertTrue(writer.append_entry(entry(number)))
+        writer.close()
+
+        reader = self.open_system()
+        self.assertEqual([e["email"] for e in reader.entries], [entry(n)["email"] for n in range(4)])
+        reader.close()
+
+        # Loading again must not lose anything either.
+        reader = self.open_system()
+        self.assertEqual(len(reader.entries), 4)
+        reader.close()
+
+    def test_load_skips_records_a_crash_left_in_the_journal(self):
+        entries = [entry(n) for n in range(3)]
+        JournalStorage(self.data_file).save(entries)
+        # The snapshot was swapped in, but the crash came before the journal
+        # it folded in was truncated.
+        with open(self.data_file + ".journal", "w") as journal:
+            journal.writelines(json.dumps(dict(e, email=e["email"].upper())) + "\n" for e in entries[1:])
+
+        system = self.open_system()
+        self.assertEqual(system.entries, entries)
+        system.close()
+
+    def test_compacts_the_journal_every_compact_every_records(self):
+        system = DataEntrySystem(self.data_file, JournalStorage(self.data_file, compact_every=3))
+        for number in range(2):
+            system.append_entry(entry(number))
+        self.assertFalse(os.path.exists(self.data_file))
+        self.assertGreater(os.path.getsize(self.data_file + ".journal"), 0)
+
+        system.append_entry(entry(2))
+        self.assertEqual(os.path.getsize(self.data_file + ".journal"), 0)
+        with open(self.data_file) as snapshot:
+            self.assertEqual(json.load(snapshot), [entry(n) for n in range(3)])
+
+        system.append_entry(entry(3))
+        system.close()
+        reader = self.open_system()
+        self.assertEqual(reader.entries, [entry(n) for n in range(4)])
+        reader.close()
+
+    def test_import_reports_why_each_row_was_rejected(self):
+        system = self.open_system()
+        system.append_entry(entry(0))
+        good = {"name": "New", "age": "40", "email": "new@example.com"}
+        rows = [
+            (2, good),
+            (3, dict(good, name="  ")),
+            (4, dict(good, age="0")),
+            (5, dict(good, age="abc")),
+            (6, dict(good, email="not-an-email")),
+            (7, dict(good, email="USER0@example.com")),  # already stored
+            (8, dict(good, name="Again", email="NEW@example.com")),  # earlier in the input
+            (9, None),
+        ]
+        rejects = []
+        imported = system.import_entries(iter(rows), batch_size=3, on_reject=lambda *reject: rejects.append(reject))
+
+        self.assertEqual(imported, (1, 7))
+        self.assertEqual([(line_no, reason) for line_no, _, reason in rejects], [
+            (3, "name is blank"),
+            (4, "age must be a number between 1 and 120"),
+            (5, "age must be a number between 1 and 120"),
+            (6, "invalid email format"),
+            (7, "duplicate email"),
+            (8, "duplicate email"),
+            (9, "unparseable record"),
+        ])
+        self.assertEqual([e["email"] for e in system.entries], ["user0@example.com", "new@example.com"])
+        system.close()
+
+
+class ExportTest(StoreTestCase):
+    def export(self, system, **options):
+        path = os.path.join(self.directory.name, "export.json")
+        system.export_entries(path, "json", **options)
+        with open(path, "rb") as file:
+            return file.read()
+
+    def test_json_export_matches_json_dump_byte_for_byte(self):
+        entries = [entry(n) for n in range(5)] + [dict(entry(5), name="Émile \"Zola\"", address="1 Rue\nParis")]
+        writer = self.open_system()
+        for e in entries:
+            writer.append_entry(e)
+        writer.close()
+        expected = json.dumps(entries, indent=2).encode("utf-8")
+
+        streamed = self.open_system()  # not loaded, so the export streams from storage
+        self.assertEqual(self.export(streamed, chunk_size=2), expected)
+        streamed.close()
+        loaded = self.open_system()
+        loaded.entries
+        self.assertEqual(self.export(loaded), expected)
+        loaded.close()
+
+    def test_empty_json_export(self):
+        system = self.open_system()
+        self.assertEqual(self.export(system), b"[]")
+        system.close()
+
+
+class JSONFileStorageTest(StoreTestCase):
+    storage = JSONFileStorage
+
+    def test_import_keeps_batches_when_another_writer_saves(self):
+        other = self.open_system()
+        other.entries
+        writes = threading.Thread(target=other.append_entry, args=(entry(1000),))
+
+        def rows():
+            # Another writer saves after the first batch has been committed.
+            for line_no, row in import_rows(range(20)):
+                if line_no == 12:
+                    writes.start()
+                    writes.join(0.5)
+                yield line_no, row
+
+        system = self.open_system()
+        self.assertEqual(system.import_entries(rows(), batch_size=10), (20, 0))
+        system.close()
+        writes.join()
+        other.close()
+
+        reader = self.open_system()
+        self.assertEqual(len(reader.entries), 21)
+        reader.close()
+
+
+class SQLiteStorageTest(StoreTestCase):
+    storage = SQLiteStorage
+
+    def test_migrates_a_journal_store_once(self):
+        journal = DataEntrySystem(self.data_file, JournalStorage(self.data_file))
+        for number in range(3):
+            journal.append_entry(entry(number))
+        journal.close()
+        self.assertFalse(os.path.exists(self.data_file))  # nothing compacted into a snapshot yet
+
+        system = self.open_system()
+        self.assertEqual(len(system.entries), 3)
+        system.close()
+
+        journal = DataEntrySystem(self.data_file, JournalStorage(self.data_file))
+        journal.append_entry(entry(3))
+        journal.save_entries()
+        journal.close()
+        system = self.open_system()
+        self.assertEqual(len(system.entries), 3)
+        system.close()
+
+    def test_import_reports_emails_another_writer_stored_first(self):
+        data_file = self.data_file
+
+        class Racing(SQLiteStorage):
+            def append_many(self, entries):
+                # Another process stores one of the batch's emails after the
+                # import checked it.
+                other = DataEntrySystem(data_file, SQLiteStorage(data_file))
+                other.append_entry(entry(3))
+                other.close()
+                return super().append_many(entries)
+
+        rejects = []
+        system = DataEntrySystem(data_file, Racing(data_file))
+        imported = system.import_entries(import_rows(range(5)), on_reject=lambda *reject: rejects.append(reject))
+        self.assertEqual(imported, (4, 1))
+        self.assertEqual(rejects, [(5, {"name": "User 3", "age": "30", "email": "user3@example.com"},
+                                    "duplicate email")])
+        self.assertEqual(len(system.entries), 5)
+        system.close()
+
+    def test_search_folds_case_beyond_ascii(self):
+        system = self.open_system()
+        system.append_entry(dict(entry(0), name="Émile Zola"))
+        system.append_entry(dict(entry(1), name="Plain Name"))
+        for term in ("émile", "ÉMILE", "zOLA"):
+            self.assertEqual([e["name"] for e in system.find_entries(term)], ["Émile Zola"])
+        system.close()
+
+
+if __name__ == "__main__":
+    unittest.main()